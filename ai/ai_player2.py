@@ -1,7 +1,19 @@
 # ai/ai_player2.py
 import math
 import random
-from ai.pathfinding import AStarPathfinder
+from ai.distance_maps import DistanceMapCache
+from ai.path_analysis import PathAnalysis
+from ai.wall_batch import WallImpactEngine
+from ai.search_control import Deadline, SearchTimeout, MAX_ITERATIVE_DEPTH
+from ai.wall_candidates import path_cutting_walls
+from ai.root_parallel import parallel_root_scores
+from ai.opening_book import OpeningBook
+from ai.endgame import endgame_move
+from game_rules import BOARD_SIZE, CELL_COORDS
+
+# Largest |evaluate()| short of a win: path advantage stays below the number
+# of cells and wall advantage within the 10 walls each player starts with
+EVAL_BOUND = 0.8 * (BOARD_SIZE * BOARD_SIZE - 1) + 0.2 * 10
 
 class FuzzySystem2:
     def __init__(self):
@@ -115,18 +127,86 @@ class AIPlayer2:
     AI Player 2 uses Expectimax + Fuzzy Logic + A* Pathfinding
     """
 
-    def __init__(self, player_id, max_depth=3):
+    def __init__(self, player_id, max_depth=3, time_limit_ms=None,
+                 wall_search=False, wall_candidates=6, node_budget=None, root_workers=None,
+                 opening_book=None):
         self.player_id = player_id
         self.max_depth = max_depth
-        self.pathfinder = AStarPathfinder(lambda p, **kwargs: [])
+        # Walls placed inside the search mean many more wall layouts to cache
+        self.distance_maps = DistanceMapCache(max_entries=4096 if wall_search else 64)
+        self.wall_engine = WallImpactEngine()
         self.fuzzy = FuzzySystem2()
         self.recent_positions = []
         self.max_history = 6
+        # With a time limit, pawn search deepens iteratively instead of
+        # stopping at max_depth
+        self.time_limit_ms = time_limit_ms
+        self.deadline = Deadline()
+        self.completed_depth = 0
+        # Path facts about the position being decided (see PathAnalysis)
+        self.analysis = None
+        # Wall-search mode: the search also tries up to wall_candidates walls
+        # that cut the opponent's shortest route. node_budget caps the nodes
+        # searched per move (deepening iteratively, like time_limit_ms).
+        self.wall_search = wall_search
+        self.wall_candidates = wall_candidates
+        self.node_budget = node_budget
+        # Root-parallel mode: fixed-depth root searches score their root moves
+        # on a persistent pool of root_workers processes (see root_parallel).
+        # Time- and node-budgeted searches stay in this process.
+        self.root_workers = root_workers
+        # Opening book file (see opening_book); book positions skip the search
+        self.opening_book = OpeningBook(opening_book) if opening_book else None
+        self.nodes = 0
+        self.cutoffs = 0
+
+    def new_game(self):
+        """Forget per-game state; search and pathfinding caches are kept"""
+        self.recent_positions = []
+
+    def choose_move(self, board, return_fuzzy=False, time_limit_ms=None):
+        """
+        Pick ("move", pos) or ("wall", (row, col, orient)).
+        time_limit_ms (default: the constructor's) bounds the whole call.
+        """
+        if self.opening_book is not None:
+            action = self.opening_book.lookup(board.zobrist_key(self.player_id))
+            if action is not None:
+                return self._precomputed_move(action, return_fuzzy)
+        # With no walls left on either side the tablebase knows the best move
+        action = endgame_move(board, self.player_id)
+        if action is not None:
+            return self._precomputed_move(action, return_fuzzy)
+        if time_limit_ms is None:
+            time_limit_ms = self.time_limit_ms
+        self.deadline = Deadline(time_limit_ms, self.node_budget)
+        try:
+            return self._choose_move(board, return_fuzzy)
+        finally:
+            self.deadline = Deadline()
+            self.analysis = None
+
+    def _precomputed_move(self, action, return_fuzzy):
+        """An opening-book or endgame-tablebase action as choose_move returns it"""
+        if type(action) is int:
+            move, fuzzy_value = ("move", list(CELL_COORDS[action])), (1.0, 0.0)
+            self.recent_positions.append(CELL_COORDS[action])
+            if len(self.recent_positions) > self.max_history:
+                self.recent_positions.pop(0)
+        else:
+            move, fuzzy_value = ("wall", action), (0.0, 1.0)
+        return (move, fuzzy_value) if return_fuzzy else move
+
+    def _path_analysis(self, board):
+        """This turn's PathAnalysis, started afresh once the board has changed"""
+        if self.analysis is None or not self.analysis.matches(board):
+            self.analysis = PathAnalysis(board, self.distance_maps)
+        return self.analysis
 
-    def choose_move(self, board, return_fuzzy=False):
-        self.pathfinder.get_legal_moves = board.get_legal_moves
-        p1_dist = self.pathfinder.find_path_length(board, 1)
-        p2_dist = self.pathfinder.find_path_length(board, 2)
+    def _choose_move(self, board, return_fuzzy):
+        analysis = self._path_analysis(board)
+        p1_dist = analysis.distance(1)
+        p2_dist = analysis.distance(2)
         
         # Handle None distances
         if p1_dist is None:
@@ -199,8 +279,16 @@ class AIPlayer2:
 
         move = None
         preferred_type = action_type
-        for attempt in [preferred_type, "wall" if preferred_type == "move" else "move"]:
-            if attempt == "move":
+        attempts = [preferred_type, "wall" if preferred_type == "move" else "move"]
+        if self.wall_search and walls_left > 0:
+            # Pawn moves and candidate walls compete in one search
+            attempts.insert(0, "search")
+        for attempt in attempts:
+            if attempt == "search":
+                move = self.choose_searched_action(board)
+                if move is not None:
+                    break
+            elif attempt == "move":
                 legal_moves = board.get_legal_moves(self.player_id)
                 if legal_moves:
                     pos = self.choose_pawn_move(board)
@@ -221,32 +309,71 @@ class AIPlayer2:
         else:
             return move
         
-    def expectimax(self, board, depth, maximizing):
-        """Expectimax Algorithm"""
+    def expectimax(self, board, depth, maximizing, alpha=-math.inf, beta=math.inf):
+        """
+        Expectimax Algorithm with Star1 pruning: a chance node stops as soon
+        as the bounds on its unsearched moves (see _chance_bounds) put its
+        average outside (alpha, beta). A pruned node returns that bound.
+        """
+        self.nodes += 1
         current_player = self.player_id if maximizing else 3 - self.player_id
 
         if depth == 0 or self.is_terminal(board):
+            # Leaves count toward a node budget but never raise, so a depth-1
+            # pass always completes
+            self.deadline.nodes += 1
             return self.evaluate(board)
+        self.deadline.check()
 
-        legal_moves = board.get_legal_moves(current_player)
+        legal_moves = self._search_actions(board, current_player)
         if not legal_moves:
             return self.evaluate(board)
 
         if maximizing:
             value = -math.inf
             for move in legal_moves:
-                new_board = board.clone()
-                new_board.apply_move(current_player, move)
-                value = max(value, self.expectimax(new_board, depth - 1, False))
+                self._push_action(board, current_player, move)
+                value = max(value, self.expectimax(board, depth - 1, False, max(alpha, value), beta))
+                board.undo()
+                if value >= beta:
+                    break
             return value
         else:
             # Opponent assumed to act probabilistically
-            values = []
-            for move in legal_moves:
-                new_board = board.clone()
-                new_board.apply_move(current_player, move)
-                values.append(self.expectimax(new_board, depth - 1, True))
-            return sum(values) / len(values)
+            lower, upper = self._chance_bounds(board, depth)
+            count = len(legal_moves)
+            total = 0
+            for i, move in enumerate(legal_moves):
+                # Unsearched moves are worth at most upper and at least lower
+                rest_upper = (count - i - 1) * upper if i < count - 1 else 0
+                rest_lower = (count - i - 1) * lower if i < count - 1 else 0
+                self._push_action(board, current_player, move)
+                value = self.expectimax(board, depth - 1, True,
+                                        count * alpha - total - rest_upper,
+                                        count * beta - total - rest_lower)
+                board.undo()
+                total += value
+                if (total + rest_upper) / count <= alpha:
+                    self.cutoffs += 1
+                    return (total + rest_upper) / count
+                if (total + rest_lower) / count >= beta:
+                    self.cutoffs += 1
+                    return (total + rest_lower) / count
+            return total / count
+
+    def _chance_bounds(self, board, depth):
+        """
+        (lower, upper) bounds on evaluate() anywhere below a chance node with
+        depth plies left. A pawn moves at most two rows per turn, so a player
+        too far from goal to arrive in time cannot produce an infinite score.
+        """
+        my_goal = 0 if self.player_id == 1 else board.size - 1
+        opp_goal = board.size - 1 - my_goal
+        my_rows = abs(board.pawn_cell(self.player_id) // board.size - my_goal)
+        opp_rows = abs(board.opponent_cell(self.player_id) // board.size - opp_goal)
+        upper = EVAL_BOUND if my_rows > 2 * (depth // 2) else math.inf
+        lower = -EVAL_BOUND if opp_rows > 2 * ((depth + 1) // 2) else -math.inf
+        return lower, upper
 
     def choose_pawn_move(self, board):
         legal_moves = board.get_legal_moves(self.player_id)
@@ -263,8 +390,7 @@ class AIPlayer2:
         current_pos = tuple(board.get_pawn_position(self.player_id))
 
         # Get the optimal path using A*
-        self.pathfinder.get_legal_moves = board.get_legal_moves
-        optimal_path = self.pathfinder.find_path(board, self.player_id)
+        optimal_path = self._path_analysis(board).path(self.player_id)
         
         # If we have a clear optimal path, follow it
         if optimal_path and len(optimal_path) > 1:
@@ -282,14 +408,13 @@ class AIPlayer2:
                     return next_pos_in_path
         
         # Fallback: Use expectimax for complex situations or when path following isn't ideal
+        self.nodes = 0
+        self.cutoffs = 0
+        search_scores = self._search_root(board, legal_moves)
         best_score = -math.inf
         best_move = None
 
-        for move in legal_moves:
-            new_board = board.clone()
-            new_board.apply_move(self.player_id, move)
-            score = self.expectimax(new_board, self.max_depth - 1, False)
-            
+        for move, score in zip(legal_moves, search_scores):
             move_tuple = tuple(move)
             if move_tuple in self.recent_positions:
                 repetition_penalty = 5 * (self.max_history - self.recent_positions.index(move_tuple))
@@ -321,15 +446,103 @@ class AIPlayer2:
         
         return best_move
 
+    def choose_searched_action(self, board):
+        """
+        Wall-search mode: score pawn moves and candidate walls with one
+        search. Returns ("move", pos), ("wall", (row, col, orient)) or None.
+        """
+        actions = self._search_actions(board, self.player_id)
+        if not actions:
+            return None
+
+        self.nodes = 0
+        self.cutoffs = 0
+        search_scores = self._search_root(board, actions)
+        best_score = -math.inf
+        best_action = None
+        for action, score in zip(actions, search_scores):
+            if type(action) is int and CELL_COORDS[action] in self.recent_positions:
+                score -= 5 * (self.max_history - self.recent_positions.index(CELL_COORDS[action]))
+            if score > best_score:
+                best_score = score
+                best_action = action
+
+        if best_action is None:
+            return None
+        if type(best_action) is not int:
+            return ("wall", best_action)
+        self.recent_positions.append(CELL_COORDS[best_action])
+        if len(self.recent_positions) > self.max_history:
+            self.recent_positions.pop(0)
+        return ("move", list(CELL_COORDS[best_action]))
+
+    def _search_actions(self, board, player):
+        """Pawn moves as cell indexes, plus candidate walls (row, col, orient) in wall-search mode"""
+        actions = board.legal_move_cells(player)
+        if self.wall_search and board.get_walls_remaining(player) > 0:
+            opponent_map = self.distance_maps.get_map(board, 3 - player)
+            actions = actions + path_cutting_walls(board, opponent_map, 3 - player, self.wall_candidates)
+        return actions
+
+    def _push_action(self, board, player, action):
+        """Apply a search action: a cell index, a [row, col] root move or a wall"""
+        if type(action) is int:
+            board.push_move_cell(player, action)
+        elif len(action) == 3:
+            board.push_wall(player, *action, trusted=True)
+        else:
+            board.push_move(player, action)
+
+    def _search_root(self, board, legal_moves):
+        """
+        Expectimax score of each root move at max_depth, or, under a
+        deadline, from the deepest iteration that finished in time
+        """
+        if not self.deadline.active():
+            self.completed_depth = self.max_depth
+            if self.root_workers and len(legal_moves) > 1:
+                return parallel_root_scores(self, board, legal_moves, self.max_depth, self.root_workers)
+            return [self._root_score(board, move, self.max_depth) for move in legal_moves]
+
+        # Depth 1 only evaluates the children, so it always completes
+        scores = [self._root_score(board, move, 1) for move in legal_moves]
+        self.completed_depth = 1
+        mark = len(board.history)
+        for depth in range(2, MAX_ITERATIVE_DEPTH + 1):
+            try:
+                scores = [self._root_score(board, move, depth) for move in legal_moves]
+            except SearchTimeout:
+                while len(board.history) > mark:
+                    board.undo()
+                break
+            self.completed_depth = depth
+        return scores
+
+    def _root_score(self, board, move, depth):
+        self._push_action(board, self.player_id, move)
+        score = self.expectimax(board, depth - 1, False)
+        board.undo()
+        return score
+
+    def root_parallel_options(self):
+        """Constructor options a root-parallel worker copy of this AI needs"""
+        return (("max_depth", self.max_depth), ("wall_search", self.wall_search),
+                ("wall_candidates", self.wall_candidates))
+
+    def score_root_move(self, board, move, depth):
+        """Score of one root move from a fresh search, as a root-parallel worker runs it"""
+        self.nodes = 0
+        self.cutoffs = 0
+        return self._root_score(board, move, depth)
+
     def choose_wall_placement(self, board):
         """Choose wall placement with improved urgency and blocking logic"""
         best_score = -math.inf
         candidates = []
         
-        self.pathfinder.get_legal_moves = board.get_legal_moves
+        analysis = self._path_analysis(board)
         opponent_id = 3 - self.player_id
-        opponent_dist = self.pathfinder.find_path_length(board, opponent_id)
-        my_dist = self.pathfinder.find_path_length(board, self.player_id)
+        opponent_dist = analysis.distance(opponent_id)
         
         opp_pos = board.get_pawn_position(opponent_id)
         if opp_pos is None:
@@ -344,23 +557,23 @@ class AIPlayer2:
             winning_moves = [m for m in opp_legal_moves if m[0] == opponent_goal_row]
             
             if winning_moves:
-                for row in range(board.size - 1):
-                    for col in range(board.size - 1):
-                        for orient in ['H', 'V']:
-                            if board.is_valid_wall(row, col, orient):
-                                new_board = board.clone()
-                                new_board.place_wall(self.player_id, row, col, orient)
-                                self.pathfinder.get_legal_moves = new_board.get_legal_moves
-                                new_opp_dist = self.pathfinder.find_path_length(new_board, opponent_id)
-                                
-                                if new_opp_dist is not None and new_opp_dist > 1:
-                                    score = 1000
+                # Only a wall cutting every shortest route can push the opponent back
+                dag = analysis.dag(opponent_id)
+                impacts = self.wall_engine.evaluate(board)
+                for row, col, orient in board.open_wall_slots():
+                    if candidates and self.deadline.expired():
+                        break
+                    if dag.is_cut_by(row, col, orient) and impacts.is_legal(row, col, orient):
+                        new_opp_dist = impacts.distance(row, col, orient, opponent_id)
+                        
+                        if new_opp_dist is not None and new_opp_dist > 1:
+                            score = 1000
                                     
-                                    if score > best_score:
-                                        best_score = score
-                                        candidates = [(row, col, orient)]
-                                    elif score == best_score:
-                                        candidates.append((row, col, orient))
+                            if score > best_score:
+                                best_score = score
+                                candidates = [(row, col, orient)]
+                            elif score == best_score:
+                                candidates.append((row, col, orient))
                 
                 if candidates:
                     chosen = random.choice(candidates)
@@ -368,7 +581,7 @@ class AIPlayer2:
                 else:
                     return None
 
-        opponent_path = self._find_opponent_path(board, opponent_id)
+        opponent_path = analysis.dag(opponent_id).path
         
         if is_urgent:
             search_positions = self._get_urgent_wall_positions(board, opp_pos, opponent_path)
@@ -377,13 +590,15 @@ class AIPlayer2:
         
         min_path_increase = 0 if (is_critical or is_urgent) else 1
         
+        # Walls that leave a shortest route open cannot increase the path
+        dag = analysis.dag(opponent_id)
+        impacts = self.wall_engine.evaluate(board)
         for row, col in search_positions:
+            if candidates and self.deadline.expired():
+                break
             for orient in ['H', 'V']:
-                if board.is_valid_wall(row, col, orient):
-                    new_board = board.clone()
-                    new_board.place_wall(self.player_id, row, col, orient)
-                    self.pathfinder.get_legal_moves = new_board.get_legal_moves
-                    new_opp_dist = self.pathfinder.find_path_length(new_board, opponent_id)
+                if dag.is_cut_by(row, col, orient) and impacts.is_legal(row, col, orient):
+                    new_opp_dist = impacts.distance(row, col, orient, opponent_id)
                     
                     if opponent_dist is None or new_opp_dist is None:
                         continue
@@ -413,28 +628,6 @@ class AIPlayer2:
             return random.choice(candidates)
         return None
     
-    def _find_opponent_path(self, board, opponent_id):
-        try:
-            from collections import deque
-            start = board.get_pawn_position(opponent_id)
-            if not start:
-                return None
-            goal_row = 0 if opponent_id == 1 else board.size - 1
-            queue = deque([(start, [start])])
-            visited = {tuple(start)}
-            while queue:
-                pos, path = queue.popleft()
-                if pos[0] == goal_row:
-                    return path
-                for next_pos in board.get_legal_moves(opponent_id, override_pos=pos):
-                    next_tuple = tuple(next_pos)
-                    if next_tuple not in visited:
-                        visited.add(next_tuple)
-                        queue.append((next_pos, path + [next_pos]))
-            return None
-        except:
-            return None
-    
     def _is_wall_on_path(self, row, col, orient, path):
         if not path or len(path) < 2:
             return False
@@ -492,9 +685,9 @@ class AIPlayer2:
         return list(positions)
 
     def evaluate(self, board):
-        self.pathfinder.get_legal_moves = board.get_legal_moves
-        p1_dist = self.pathfinder.find_path_length(board, 1)
-        p2_dist = self.pathfinder.find_path_length(board, 2)
+        # Walls are fixed inside the search, so leaves hit the cached maps
+        p1_dist = self.distance_maps.distance(board, 1)
+        p2_dist = self.distance_maps.distance(board, 2)
 
         if p1_dist == 0:
             return math.inf if self.player_id == 1 else -math.inf
@@ -510,10 +703,8 @@ class AIPlayer2:
         return score
 
     def is_terminal(self, board):
-        pos1 = board.get_pawn_position(1)
-        pos2 = board.get_pawn_position(2)
-        if pos1 and pos1[0] == 0:
+        if board.p1_cell // board.size == 0:
             return True
-        if pos2 and pos2[0] == board.size - 1:
+        if board.p2_cell // board.size == board.size - 1:
             return True
         return False
\ No newline at end of file
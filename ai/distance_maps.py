@@ -0,0 +1,71 @@
+# ai/distance_maps.py
+from collections import OrderedDict
+from ai.pathfinding import find_path_length
+from game_rules import CELL_COORDS, CELL_NEIGHBOURS
+
+
+class DistanceMapCache:
+    """
+    Goal-distance maps (see Board.goal_distances) for each wall layout seen,
+    kept in an LRU cache keyed by the board's blocked-edge masks.
+    Maps ignore the opponent pawn; distance() adds the jump-rule correction.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.maps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, board, player):
+        """Return the cached map for this wall layout, or None"""
+        key = (board.h_edges, board.v_edges, player)
+        dist_map = self.maps.get(key)
+        if dist_map is not None:
+            self.maps.move_to_end(key)
+        return dist_map
+
+    def get_map(self, board, player):
+        """
+        Flat list of size*size goal distances for player (None where the goal
+        row is unreachable), ignoring the opponent pawn
+        """
+        key = (board.h_edges, board.v_edges, player)
+        dist_map = self.maps.get(key)
+        if dist_map is not None:
+            self.hits += 1
+            self.maps.move_to_end(key)
+            return dist_map
+
+        self.misses += 1
+        dist_map = board.goal_distances(player)
+        self.maps[key] = dist_map
+        if len(self.maps) > self.max_entries:
+            self.maps.popitem(last=False)
+        return dist_map
+
+    def distance(self, board, player):
+        """Same result as find_path_length(board, player)"""
+        dist_map = self.get_map(board, player)
+        cell = board.pawn_cell(player)
+        dist = dist_map[cell]
+        if dist is None or dist == 0:
+            return dist
+
+        # The opponent pawn only changes moves out of its own neighbourhood.
+        # If no cell there can lie on a shortest path (checked with the
+        # Manhattan lower bound) the map distance is exact; otherwise fall
+        # back to A* guided by the map.
+        r, c = CELL_COORDS[cell]
+        opp = board.opponent_cell(player)
+        for zone in (opp,) + CELL_NEIGHBOURS[opp]:
+            zone_dist = dist_map[zone]
+            if zone_dist is not None:
+                zr, zc = CELL_COORDS[zone]
+                if abs(zr - r) + abs(zc - c) + zone_dist <= dist:
+                    # Plain BFS is the fastest backend here (benchmarks/pathfinding_backends.py)
+                    return find_path_length(board, player, dist_map, backend="bfs")
+        return dist
+
+    def clear(self):
+        self.maps.clear()
@@ -0,0 +1,143 @@
+# ai/endgame.py
+from collections import OrderedDict, deque
+from array import array
+from game_rules import BOARD_SIZE, legal_move_cells
+
+CELLS = BOARD_SIZE * BOARD_SIZE
+
+# Results for the side to move; UNKNOWN positions are draws (neither side
+# can force its way to goal)
+UNKNOWN = 0
+WIN = 1
+LOSS = 2
+
+# Solved wall layouts kept by endgame_table
+MAX_TABLES = 8
+
+
+def state_index(p1_cell, p2_cell, to_move):
+    return (p1_cell * CELLS + p2_cell) * 2 + to_move - 1
+
+
+class EndgameTable:
+    """
+    Exact results of the wall-free race on one wall layout: for every pawn
+    placement and side to move, whether the side to move wins or loses with
+    best play and in how many plies. Solved by retrograde analysis from the
+    finished positions, so wins are as fast and losses as slow as possible.
+    A player left without a legal move loses, as in headless.run_match.
+    """
+
+    def __init__(self, h_edges, v_edges):
+        self.h_edges = h_edges
+        self.v_edges = v_edges
+        states = CELLS * CELLS * 2
+        self.results = bytearray(states)
+        self.plies = array("H", bytes(2 * states))
+        self._solve()
+
+    def _successors(self, p1_cell, p2_cell, to_move):
+        """(move, successor state) for each legal move of the side to move"""
+        if to_move == 1:
+            return [(move, (move * CELLS + p2_cell) * 2 + 1)
+                    for move in legal_move_cells(p1_cell, p2_cell, self.h_edges, self.v_edges)]
+        return [(move, (p1_cell * CELLS + move) * 2)
+                for move in legal_move_cells(p2_cell, p1_cell, self.h_edges, self.v_edges)]
+
+    def _solve(self):
+        results, plies = self.results, self.plies
+        unresolved = [0] * len(results)
+        predecessors = [[] for _ in range(len(results))]
+        queue = deque()
+        last_row = BOARD_SIZE - 1
+        for p1_cell in range(CELLS):
+            p1_home = p1_cell // BOARD_SIZE == 0
+            for p2_cell in range(CELLS):
+                if p2_cell == p1_cell:
+                    continue
+                p2_home = p2_cell // BOARD_SIZE == last_row
+                for to_move in (1, 2):
+                    state = (p1_cell * CELLS + p2_cell) * 2 + to_move - 1
+                    if p1_home or p2_home:
+                        # The game is over; the side that just moved won if both are home
+                        winner = 3 - to_move if p1_home and p2_home else (1 if p1_home else 2)
+                        results[state] = WIN if winner == to_move else LOSS
+                        queue.append(state)
+                        continue
+                    successors = self._successors(p1_cell, p2_cell, to_move)
+                    if not successors:
+                        results[state] = LOSS
+                        queue.append(state)
+                        continue
+                    unresolved[state] = len(successors)
+                    for _, successor in successors:
+                        predecessors[successor].append(state)
+
+        # Breadth-first from the finished positions: a position is won once
+        # one move reaches a lost one, lost once every move reaches a won one
+        while queue:
+            state = queue.popleft()
+            next_plies = plies[state] + 1
+            if results[state] == LOSS:
+                for predecessor in predecessors[state]:
+                    if results[predecessor] == UNKNOWN:
+                        results[predecessor] = WIN
+                        plies[predecessor] = next_plies
+                        queue.append(predecessor)
+            else:
+                for predecessor in predecessors[state]:
+                    if results[predecessor] == UNKNOWN:
+                        unresolved[predecessor] -= 1
+                        if unresolved[predecessor] == 0:
+                            results[predecessor] = LOSS
+                            plies[predecessor] = next_plies
+                            queue.append(predecessor)
+
+    def result(self, p1_cell, p2_cell, to_move):
+        """(WIN, LOSS or UNKNOWN for the side to move, plies to the end)"""
+        state = state_index(p1_cell, p2_cell, to_move)
+        return self.results[state], self.plies[state]
+
+    def best_move(self, p1_cell, p2_cell, to_move):
+        """
+        Perfect-play move (a cell index) of the side to move: the fastest
+        win, or the slowest loss. None for draws and finished positions.
+        The first such move in legal_move_cells order is chosen.
+        """
+        state = state_index(p1_cell, p2_cell, to_move)
+        result, plies = self.results[state], self.plies[state]
+        if result == UNKNOWN or plies == 0:
+            return None
+        successors = self._successors(p1_cell, p2_cell, to_move)
+        if result == WIN:
+            for move, successor in successors:
+                if self.results[successor] == LOSS and self.plies[successor] == plies - 1:
+                    return move
+        return max(successors, key=lambda item: self.plies[item[1]])[0]
+
+
+_tables = OrderedDict()
+
+
+def endgame_table(h_edges, v_edges):
+    """The EndgameTable of a wall layout, solved on first use and cached"""
+    key = (h_edges, v_edges)
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = EndgameTable(h_edges, v_edges)
+        if len(_tables) > MAX_TABLES:
+            _tables.popitem(last=False)
+    else:
+        _tables.move_to_end(key)
+    return table
+
+
+def endgame_move(board, player):
+    """
+    Perfect-play pawn move (a cell index) for player once neither side has
+    walls left, or None while walls remain or if neither side can force a win
+    """
+    if board.p1_walls_remaining or board.p2_walls_remaining:
+        return None
+    table = endgame_table(board.h_edges, board.v_edges)
+    return table.best_move(board.p1_cell, board.p2_cell, player)
@@ -0,0 +1,102 @@
+# ai/lazy_smp.py
+# Lazy SMP: while an AI runs its budgeted iterative-deepening search, helper
+# processes search the same position with the same budget and a shared
+# transposition table. Helper results are discarded; their table entries
+# let the main search finish deeper iterations in the same time. When the
+# main search ends it advances the table's helper epoch, which stops its
+# helpers, and waits for them.
+import copy
+import time
+from concurrent.futures import wait
+
+from ai.root_parallel import get_pool
+from ai.search_control import Deadline, SearchTimeout
+from ai.transposition import SharedTranspositionTable
+
+# Seconds finish_helpers waits for stopped helpers before cancelling them
+HELPER_TIMEOUT = 1.0
+
+# Per-worker helper AIs, keyed by (class, player id): one AI per seat,
+# rebuilt when the options change and re-attached when the table changes
+_helper_ais = {}
+
+
+def _helper_ai(ai_class, player_id, options, table):
+    key = (ai_class, player_id)
+    ai = _helper_ais.get(key)
+    if ai is None or ai.helper_options != options:
+        if ai is not None:
+            ai.tt.close()
+        ai = ai_class(player_id, **dict(options))
+        ai.helper_options = options
+        ai.tt = SharedTranspositionTable(table[1], name=table[0])
+        _helper_ais[key] = ai
+    elif ai.tt.name != table[0]:
+        # A new main AI (or game): detach from the old block so it can be freed
+        ai.tt.close()
+        ai.tt = SharedTranspositionTable(table[1], name=table[0])
+    return ai
+
+
+class HelperDeadline(Deadline):
+    """A helper's budget, which also runs out once the table leaves its epoch"""
+
+    def __init__(self, table, epoch, time_limit_ms=None, max_nodes=None):
+        super().__init__(time_limit_ms, max_nodes)
+        self.table = table
+        self.epoch = epoch
+
+    def check(self):
+        super().check()
+        if self.table.epoch != self.epoch:
+            raise SearchTimeout()
+
+
+def _helper_search(ai_class, player_id, options, table, epoch, board, moves, time_limit_ms, max_nodes):
+    """Worker entry point: search board until the budget runs out; returns the depth completed"""
+    ai = _helper_ai(ai_class, player_id, options, table)
+    ai.deadline = HelperDeadline(ai.tt, epoch, time_limit_ms, max_nodes)
+    try:
+        ai._new_search()
+        ai._search_root(board, moves)
+    finally:
+        ai.deadline = Deadline()
+    return ai.completed_depth
+
+
+def start_helpers(ai, board, moves, workers):
+    """
+    Start workers helper searches of ai's current root (ai.tt must be a
+    SharedTranspositionTable, ai.deadline active). Each helper tries the
+    root moves in a different rotation so the searches diverge.
+    Returns the futures, to pass to finish_helpers when the search ends.
+    """
+    pool = get_pool(workers)
+    position = copy.copy(board)
+    options = ai.root_parallel_options()
+    table = (ai.tt.name, ai.tt.size)
+    time_limit_ms = None
+    if ai.deadline.end is not None:
+        time_limit_ms = max(ai.deadline.end - time.perf_counter(), 0) * 1000.0
+    futures = []
+    for helper in range(workers):
+        shift = (helper + 1) % len(moves)
+        futures.append(pool.submit(_helper_search, type(ai), ai.player_id, options, table, ai.tt.epoch,
+                                   position, moves[shift:] + moves[:shift], time_limit_ms,
+                                   ai.deadline.max_nodes))
+    return futures
+
+
+def finish_helpers(ai, futures, timeout=HELPER_TIMEOUT):
+    """
+    Stop the helper searches started by start_helpers and wait up to
+    timeout seconds for them; helpers still queued are cancelled. Re-raises
+    the first error a helper raised.
+    """
+    ai.tt.next_epoch()
+    done, pending = wait(futures, timeout)
+    for future in pending:
+        future.cancel()
+    for future in futures:
+        if future in done:
+            future.result()
@@ -0,0 +1,241 @@
+# ai/mcts_player.py
+import math
+import random
+from ai.distance_maps import DistanceMapCache
+from ai.search_control import Deadline
+from ai.wall_candidates import path_cutting_walls
+from game_rules import CELL_COORDS, legal_move_cells
+
+# Goal distance used for cells that cannot reach the goal row
+UNREACHABLE = 1 << 10
+
+
+class MCTSNode:
+    """One position in the search tree, reached by player making action"""
+
+    __slots__ = ("action", "player", "parent", "children", "untried", "visits", "wins", "zobrist")
+
+    def __init__(self, action, player, parent, zobrist):
+        self.action = action
+        self.player = player
+        self.parent = parent
+        self.children = []
+        # Actions of the side to move not expanded yet; None until first visited
+        self.untried = None
+        self.visits = 0
+        # Playouts won by player (draws count half)
+        self.wins = 0.0
+        self.zobrist = zobrist
+
+
+class RolloutBoard:
+    """
+    Pawn-only race from a position: the two pawn cells advanced in place
+    against fixed wall masks and goal-distance maps. Walls are only tried
+    inside the tree, so nothing here needs copying or undoing.
+    """
+
+    __slots__ = ("cells", "h_edges", "v_edges", "maps")
+
+    def __init__(self, board, maps):
+        self.cells = [None, board.p1_cell, board.p2_cell]
+        self.h_edges = board.h_edges
+        self.v_edges = board.v_edges
+        # maps[player]: goal-distance map of player for these walls
+        self.maps = maps
+
+    def race(self, to_move, max_plies, epsilon):
+        """
+        Winner (1 or 2, 0 for neither) when each side steps to its nearest
+        cell to goal, or to a random legal cell with probability epsilon
+        """
+        cells = self.cells
+        player = to_move
+        for _ in range(max_plies):
+            moves = legal_move_cells(cells[player], cells[3 - player], self.h_edges, self.v_edges)
+            if not moves:
+                break
+            dist_map = self.maps[player]
+            if random.random() < epsilon:
+                cell = random.choice(moves)
+            else:
+                cell = min(moves, key=lambda move: UNREACHABLE if dist_map[move] is None else dist_map[move])
+            cells[player] = cell
+            if dist_map[cell] == 0:
+                return player
+            player = 3 - player
+        return self.race_winner(player)
+
+    def race_winner(self, to_move):
+        """Winner of a straight race: the side to move wins if it is no further from goal"""
+        other = 3 - to_move
+        mine = self.maps[to_move][self.cells[to_move]]
+        theirs = self.maps[other][self.cells[other]]
+        if mine is None and theirs is None:
+            return 0
+        if theirs is None or (mine is not None and mine <= theirs):
+            return to_move
+        return other
+
+
+class MCTSPlayer:
+    """
+    Monte Carlo Tree Search (UCT) over pawn moves and walls that cut the
+    opponent's shortest route, with epsilon-greedy pawn-race rollouts.
+    The subtree of the chosen move is kept and reused on the next turn.
+    """
+
+    def __init__(self, player_id, iterations=2000, time_limit_ms=None, exploration=1.4,
+                 wall_candidates=4, rollout_plies=60, epsilon=0.1):
+        if iterations is None and time_limit_ms is None:
+            raise ValueError("MCTSPlayer needs an iteration or time budget")
+        self.player_id = player_id
+        # Playouts per move; with time_limit_ms set the search also stops when
+        # time runs out (iterations=None: time alone)
+        self.iterations = iterations
+        self.time_limit_ms = time_limit_ms
+        self.exploration = exploration
+        # Walls tried per tree node (see path_cutting_walls)
+        self.wall_candidates = wall_candidates
+        # Rollouts stop after rollout_plies and score the straight race
+        self.rollout_plies = rollout_plies
+        self.epsilon = epsilon
+        self.distance_maps = DistanceMapCache(max_entries=1024)
+        self.deadline = Deadline()
+        # Subtree of the last chosen move, searched again next turn
+        self.root = None
+        # Statistics of the last search
+        self.playouts = 0
+        self.reused_visits = 0
+
+    def new_game(self):
+        """Forget the search tree; distance maps are kept"""
+        self.root = None
+
+    def choose_move(self, board, return_fuzzy=False, time_limit_ms=None):
+        """
+        Pick ("move", pos) or ("wall", (row, col, orient)), the most visited
+        root action. With return_fuzzy, also the share of root visits that
+        went to pawn moves and to walls.
+        """
+        if time_limit_ms is None:
+            time_limit_ms = self.time_limit_ms
+        self.deadline = Deadline(time_limit_ms)
+        try:
+            return self._choose_move(board, return_fuzzy)
+        finally:
+            self.deadline = Deadline()
+
+    def _choose_move(self, board, return_fuzzy):
+        root = self._reuse_root(board)
+        self.reused_visits = root.visits
+        self.playouts = 0
+        # The first playout always runs, so the root gets a child to play
+        # however short the budget (as minimax always finishes depth 1)
+        while self.playouts == 0 or ((self.iterations is None or self.playouts < self.iterations)
+                                     and not self.deadline.expired()):
+            self._playout(board, root)
+            self.playouts += 1
+
+        if not root.children:
+            return None
+        best = max(root.children, key=lambda child: child.visits)
+        best.parent = None
+        self.root = best
+
+        if type(best.action) is int:
+            move = ("move", list(CELL_COORDS[best.action]))
+        else:
+            move = ("wall", best.action)
+        if return_fuzzy:
+            total = sum(child.visits for child in root.children)
+            wall_visits = sum(child.visits for child in root.children if type(child.action) is not int)
+            return move, ((total - wall_visits) / total, wall_visits / total)
+        return move
+
+    def _reuse_root(self, board):
+        """The kept node for this position (after the opponent's reply), or a new root"""
+        if self.root is not None:
+            for child in self.root.children:
+                if child.zobrist == board.zobrist:
+                    child.parent = None
+                    self.root = child
+                    return child
+        self.root = MCTSNode(None, 3 - self.player_id, None, board.zobrist)
+        return self.root
+
+    def _playout(self, board, root):
+        """One selection, expansion, rollout and backpropagation pass"""
+        node = root
+        pushed = 0
+        # Selection: descend while every action of the node has a child
+        while node.untried is not None and not node.untried and node.children:
+            node = self._select(node)
+            self._push(board, node.player, node.action)
+            pushed += 1
+
+        winner = self._winner(board)
+        if winner is None:
+            # Expansion
+            if node.untried is None:
+                node.untried = self._actions(board, 3 - node.player)
+            if node.untried:
+                action = node.untried.pop()
+                player = 3 - node.player
+                self._push(board, player, action)
+                pushed += 1
+                child = MCTSNode(action, player, node, board.zobrist)
+                node.children.append(child)
+                node = child
+                winner = self._winner(board)
+            if winner is None:
+                winner = self._rollout(board, 3 - node.player)
+        for _ in range(pushed):
+            board.undo()
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1
+            elif winner == 0:
+                node.wins += 0.5
+            node = node.parent
+
+    def _select(self, node):
+        log_visits = math.log(node.visits)
+        return max(node.children,
+                   key=lambda child: child.wins / child.visits
+                   + self.exploration * math.sqrt(log_visits / child.visits))
+
+    def _actions(self, board, player):
+        """
+        Pawn moves (cell indexes) and candidate walls of player, ordered so
+        that popping from the end expands the most promising pawn move first
+        """
+        dist_map = self.distance_maps.get_map(board, player)
+        moves = sorted(board.legal_move_cells(player),
+                       key=lambda move: UNREACHABLE if dist_map[move] is None else dist_map[move],
+                       reverse=True)
+        if board.get_walls_remaining(player) == 0:
+            return moves
+        opponent_map = self.distance_maps.get_map(board, 3 - player)
+        walls = path_cutting_walls(board, opponent_map, 3 - player, self.wall_candidates)
+        return walls[::-1] + moves
+
+    def _push(self, board, player, action):
+        if type(action) is int:
+            board.push_move_cell(player, action)
+        else:
+            board.push_wall(player, *action, trusted=True)
+
+    def _winner(self, board):
+        if board.p1_cell // board.size == 0:
+            return 1
+        if board.p2_cell // board.size == board.size - 1:
+            return 2
+        return None
+
+    def _rollout(self, board, to_move):
+        maps = [None, self.distance_maps.get_map(board, 1), self.distance_maps.get_map(board, 2)]
+        return RolloutBoard(board, maps).race(to_move, self.rollout_plies, self.epsilon)
@@ -0,0 +1,128 @@
+# ai/opening_book.py
+# Opening books: the action an AI picks, searched deeply offline, for every
+# position of the first plies of a game. Build one with
+#
+#     python -m ai.opening_book --ai AIPlayer1 --plies 8 --depth 5 --out aiplayer1.book
+#
+# and pass its path to the AI (AIPlayer1(1, opening_book="aiplayer1.book")).
+import argparse
+import mmap
+import random
+import struct
+
+from game_rules import Board, action_code, code_action
+
+# File layout: header (magic, entry count), then entries sorted by key.
+# key is Board.zobrist_key(side to move), code an action_code
+BOOK_MAGIC = b"QRBOOK01"
+BOOK_HEADER = struct.Struct("<8sI")
+BOOK_ENTRY = struct.Struct("<QH")
+
+
+class OpeningBook:
+    """A book file mapped read-only with mmap; lookups binary-search the keys in place"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = BOOK_HEADER.unpack_from(self.map, 0)
+        if magic != BOOK_MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, key):
+        """Book action for key: a cell index, a wall (row, col, orientation) or None"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_key, code = BOOK_ENTRY.unpack_from(self.map, BOOK_HEADER.size + mid * BOOK_ENTRY.size)
+            if entry_key == key:
+                return code_action(code)
+            if entry_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def close(self):
+        self.map.close()
+
+
+def write_book(path, entries):
+    """Write {key: action} as a book file"""
+    with open(path, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, len(entries)))
+        for key in sorted(entries):
+            f.write(BOOK_ENTRY.pack(key, action_code(entries[key])))
+
+
+def build_book(ai_class, plies, depth, players=(1, 2), **options):
+    """
+    {zobrist key: action} for the first plies of a game: at each position
+    where a book player is to move, the action a fresh ai_class(player,
+    max_depth=depth, **options) chooses; every opponent pawn move is
+    followed. Games that leave the book (a wall by the opponent, say) fall
+    back to normal search.
+    """
+    entries = {}
+    for player_id in players:
+        ai = ai_class(player_id, max_depth=depth, **options)
+        _collect(Board(), 1, 0, plies, ai, entries, set())
+    return entries
+
+
+def _collect(board, to_move, ply, plies, ai, entries, seen):
+    if ply >= plies or board.p1_cell // board.size == 0 or board.p2_cell // board.size == board.size - 1:
+        return
+    key = board.zobrist_key(to_move)
+    if key in seen:
+        return
+    seen.add(key)
+
+    if to_move == ai.player_id:
+        # A fresh game each time, so the action depends on the position alone
+        ai.new_game()
+        result = ai.choose_move(board)
+        if result is None:
+            return
+        kind, action = result
+        if kind == "move":
+            action = action[0] * board.size + action[1]
+            board.push_move_cell(to_move, action)
+        else:
+            action = tuple(action)
+            board.push_wall(to_move, *action)
+        entries[key] = action
+        _collect(board, 3 - to_move, ply + 1, plies, ai, entries, seen)
+        board.undo()
+    else:
+        for cell in board.legal_move_cells(to_move):
+            board.push_move_cell(to_move, cell)
+            _collect(board, 3 - to_move, ply + 1, plies, ai, entries, seen)
+            board.undo()
+
+
+def main():
+    from ai.ai_player1 import AIPlayer1
+    from ai.ai_player2 import AIPlayer2
+
+    parser = argparse.ArgumentParser(description="Build an opening book file")
+    parser.add_argument("--ai", choices=("AIPlayer1", "AIPlayer2"), default="AIPlayer1")
+    parser.add_argument("--plies", type=int, default=8, help="book covers plies 0 .. plies - 1")
+    parser.add_argument("--depth", type=int, default=5, help="search depth of the book moves")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the AIs' random tie-breaks")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    ai_class = AIPlayer1 if args.ai == "AIPlayer1" else AIPlayer2
+    entries = build_book(ai_class, args.plies, args.depth)
+    write_book(args.out, entries)
+    print(f"{len(entries)} positions written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# ai/path_analysis.py
+from ai.pathfinding import ShortestPathDag, find_path
+
+
+class PathAnalysis:
+    """
+    Path facts about one board position, each computed on first use and
+    shared by everything an AI looks at during its turn: goal distances,
+    the A* path, distance maps and shortest-path DAGs of both players.
+    """
+
+    def __init__(self, board, distance_maps):
+        self.board = board
+        self.zobrist = board.zobrist
+        self.distance_maps = distance_maps
+        self.distances = {}
+        self.paths = {}
+        self.dags = {}
+
+    def matches(self, board):
+        """Whether this analysis still describes board"""
+        return board is self.board and board.zobrist == self.zobrist
+
+    def distance(self, player):
+        """Shortest path length to goal (jumps included), or None"""
+        if player not in self.distances:
+            self.distances[player] = self.distance_maps.distance(self.board, player)
+        return self.distances[player]
+
+    def path(self, player):
+        """The path find_path returns, or None"""
+        if player not in self.paths:
+            self.paths[player] = find_path(self.board, player)
+        return self.paths[player]
+
+    def distance_map(self, player):
+        """Goal-distance map ignoring the opponent pawn (see DistanceMapCache)"""
+        return self.distance_maps.get_map(self.board, player)
+
+    def dag(self, player):
+        """Every shortest path of player (see ShortestPathDag)"""
+        if player not in self.dags:
+            self.dags[player] = ShortestPathDag(self.board, player)
+        return self.dags[player]
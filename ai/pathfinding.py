@@ -1,9 +1,209 @@
 import heapq
+from game_rules import BOARD_SIZE, CELL_COORDS, add_wall_edges, cell_of, legal_move_cells
+
+
+def find_path_length(board, player, dist_map=None, backend="astar"):
+    """
+    Shortest path length from player's pawn to its goal row (jumps included),
+    or None if there is none. Keeps no state between calls, so it is safe to
+    use from several threads at once. dist_map, the board's goal-distance map
+    for player (see Board.goal_distances), sharpens the heuristic and prunes
+    dead ends. backend picks the search (see PATH_BACKENDS); all return the
+    same length.
+    """
+    return astar_search(*_search_state(board, player), dist_map=dist_map, backend=backend)
+
+
+def find_path(board, player, dist_map=None, backend="astar"):
+    """
+    Like find_path_length, but returns the path as a list of (row, col) or
+    None. Backends may pick different paths of the same length.
+    """
+    return astar_search(*_search_state(board, player), dist_map=dist_map,
+                        return_path=True, backend=backend)
+
+
+def _search_state(board, player):
+    return (board.pawn_cell(player), board.opponent_cell(player),
+            board.h_edges, board.v_edges, 0 if player == 1 else board.size - 1)
+
+
+def astar_search(start, opponent, h_edges, v_edges, goal_row, dist_map=None,
+                 return_path=False, backend="astar"):
+    """
+    Search from start to goal_row given only the pawns and the blocked-edge
+    masks. Pawns are cell indexes or (row, col) positions.
+    """
+    if start is None:
+        return None
+    if not isinstance(start, int):
+        start = cell_of(start)
+    if not isinstance(opponent, int):
+        opponent = cell_of(opponent)
+    return PATH_BACKENDS[backend](start, goal_row,
+                                  lambda cell: legal_move_cells(cell, opponent, h_edges, v_edges),
+                                  dist_map, return_path)
+
+
+# Backends search over cell indexes: (start_cell, goal_row, neighbours,
+# dist_map, return_path), where neighbours(cell) lists the cells reachable in
+# one move. Paths come back as lists of (row, col).
+
+def _astar(start, goal_row, neighbours, dist_map, return_path):
+    heuristic = lambda cell: abs(cell // BOARD_SIZE - goal_row)
+    if dist_map is not None:
+        if dist_map[start] is None:
+            return None
+        # The map ignores the opponent pawn and a jump saves at most one
+        # step, so map distance - 1 stays admissible
+        heuristic = lambda cell: max(dist_map[cell] - 1, 0)
+
+    h_start = heuristic(start)
+    open_set = [(h_start, 0, start)]
+
+    # Track visited nodes and their g_scores
+    g_scores = {start: 0}
+
+    # For path reconstruction
+    came_from = {}
+
+    while open_set:
+        # Get node with lowest f_score
+        f_current, g_current, current = heapq.heappop(open_set)
+
+        # Goal check
+        if current // BOARD_SIZE == goal_row:
+            if return_path:
+                # Reconstruct path
+                path = [CELL_COORDS[current]]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(CELL_COORDS[current])
+                path.reverse()
+                return path
+            else:
+                return g_current  # Path length
+
+        # Explore neighbors
+        for neighbor in neighbours(current):
+            if dist_map is not None and dist_map[neighbor] is None:
+                continue  # Goal row unreachable from here even without the opponent
+            tentative_g = g_current + 1  # Cost to move is always 1
+
+            # If this path to neighbor is better than any previous one
+            if neighbor not in g_scores or tentative_g < g_scores[neighbor]:
+                # Update path
+                came_from[neighbor] = current
+                g_scores[neighbor] = tentative_g
+
+                # Calculate f_score and add to open set
+                h_score = heuristic(neighbor)
+                f_score = tentative_g + h_score
+                heapq.heappush(open_set, (f_score, tentative_g, neighbor))
+
+    # No path found
+    return None
+
+
+def _flat_path(parents, cell):
+    path = [CELL_COORDS[cell]]
+    while parents[cell] != cell:
+        cell = parents[cell]
+        path.append(CELL_COORDS[cell])
+    path.reverse()
+    return path
+
+
+def _bfs(start, goal_row, neighbours, dist_map, return_path):
+    """Every move costs 1, so plain breadth-first search over flat cell arrays suffices"""
+    if dist_map is not None and dist_map[start] is None:
+        return None
+    parents = [-1] * (BOARD_SIZE * BOARD_SIZE)
+    parents[start] = start
+    frontier = [start]
+    steps = 0
+    while frontier:
+        next_frontier = []
+        for cell in frontier:
+            if cell // BOARD_SIZE == goal_row:
+                return _flat_path(parents, cell) if return_path else steps
+            for neighbor in neighbours(cell):
+                if parents[neighbor] < 0 and (dist_map is None or dist_map[neighbor] is not None):
+                    parents[neighbor] = cell
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        steps += 1
+    return None
+
+
+def _dial(start, goal_row, neighbours, dist_map, return_path):
+    """
+    A* whose f-scores are small integers, so a list of buckets (Dial's
+    algorithm) replaces the heap and flat cell arrays replace the dicts
+    """
+    cells = BOARD_SIZE * BOARD_SIZE
+    if dist_map is None:
+        # A straight jump covers two rows in one move, and a shortest path
+        # jumps at most once, so the row distance alone can overestimate
+        heuristic = [max(abs(cell // BOARD_SIZE - goal_row) - 1, 0) for cell in range(cells)]
+    else:
+        heuristic = [0 if dist is None else max(dist - 1, 0) for dist in dist_map]
+    if dist_map is not None and dist_map[start] is None:
+        return None
+
+    g_scores = [-1] * cells
+    parents = [-1] * cells
+    g_scores[start] = 0
+    parents[start] = start
+    # Buckets by f-score, created as needed; highest bounds the scan
+    lowest = highest = heuristic[start]
+    buckets = {lowest: [(0, start)]}
+    while lowest <= highest:
+        bucket = buckets.get(lowest)
+        if not bucket:
+            lowest += 1
+            continue
+        g, cell = bucket.pop()
+        if g != g_scores[cell]:
+            continue  # Superseded by a shorter route
+        if cell // BOARD_SIZE == goal_row:
+            return _flat_path(parents, cell) if return_path else g
+        for neighbor in neighbours(cell):
+            if dist_map is not None and dist_map[neighbor] is None:
+                continue
+            if g_scores[neighbor] < 0 or g + 1 < g_scores[neighbor]:
+                g_scores[neighbor] = g + 1
+                parents[neighbor] = cell
+                f_score = g + 1 + heuristic[neighbor]
+                buckets.setdefault(f_score, []).append((g + 1, neighbor))
+                # Jumps make the heuristics inconsistent, so f can drop
+                lowest = min(lowest, f_score)
+                highest = max(highest, f_score)
+    return None
+
+
+# Interchangeable searches, see the note above _astar
+PATH_BACKENDS = {"astar": _astar, "bfs": _bfs, "dial": _dial}
+
 
 class AStarPathfinder:
-    def __init__(self, get_legal_moves_func):
+    """
+    Object interface over the same search, reading moves through a
+    replaceable get_legal_moves function. That makes an instance unsafe to
+    share between concurrent searches; new code should use find_path_length
+    and find_path.
+    """
+
+    def __init__(self, get_legal_moves_func, distance_maps=None, backend="astar"):
         # Reference to Board.get_legal_moves(player)
         self.get_legal_moves = get_legal_moves_func
+        # Optional DistanceMapCache; cached goal-distance maps replace the
+        # Manhattan heuristic
+        self.distance_maps = distance_maps
+        # Search implementation, a key of PATH_BACKENDS
+        if backend not in PATH_BACKENDS:
+            raise ValueError(f"unknown pathfinding backend {backend!r}")
+        self.backend = backend
 
     def manhattan_heuristic(self, position, goal_row):
         return abs(position[0] - goal_row)
@@ -17,59 +217,130 @@ class AStarPathfinder:
         return result  # Returns path list or None
 
     def _astar_search(self, board, player, return_path=False):
-        start_list = board.get_pawn_position(player)
-        if start_list is None:
+        start = board.get_pawn_position(player)
+        if start is None:
             return None
-        start = tuple(start_list)
+        goal_row = 0 if player == 1 else board.size - 1
+        dist_map = self.distance_maps.peek(board, player) if self.distance_maps is not None else None
+        neighbours = lambda cell: [cell_of(move) for move in
+                                   self.get_legal_moves(player=player, override_pos=list(CELL_COORDS[cell]))]
+        return PATH_BACKENDS[self.backend](cell_of(start), goal_row, neighbours, dist_map, return_path)
+
+
+class ShortestPathDag:
+    """
+    Every shortest route of player to its goal row (jumps included, opponent
+    pawn fixed), stored as the moves that lie on at least one of them.
+
+    length: shortest path length, or None if the goal row is unreachable
+    path: the first shortest path a breadth-first search finds, as a list of
+        positions from the pawn, or None
+    moves[k]: (from_pos, to_pos, h_mask, v_mask) for each such move from
+        step k to step k + 1, with the board edges it crosses as bitmasks
+        in the Board.h_edges / Board.v_edges layout
+    h_edges / v_edges: edges crossed by some shortest path
+    must_h_edges / must_v_edges: edges crossed by every shortest path
+    """
 
-        # Goal row depends on player
+    def __init__(self, board, player):
+        self.size = board.size
+        self.start = CELL_COORDS[board.pawn_cell(player)]
+        self.opponent = CELL_COORDS[board.opponent_cell(player)]
+        self.length = None
+        self.path = None
+        self.moves = []
+        self.h_edges = self.v_edges = 0
+        self.must_h_edges = self.must_v_edges = 0
+
+        # Breadth-first layers over cell indexes
         goal_row = 0 if player == 1 else board.size - 1
+        start = board.pawn_cell(player)
+        layers = [[start]]
+        steps = {start: 0}
+        parents = {}
+        successors = {}
+        while layers[-1]:
+            if any(cell // self.size == goal_row for cell in layers[-1]):
+                self.length = len(layers) - 1
+                break
+            next_layer = []
+            for cell in layers[-1]:
+                successors[cell] = []
+                for move in board.legal_move_cells(player, cell):
+                    if move not in steps:
+                        steps[move] = len(layers)
+                        parents[move] = cell
+                        next_layer.append(move)
+                    if steps[move] == len(layers):
+                        successors[cell].append(move)
+            layers.append(next_layer)
+        if self.length is None:
+            return
 
-        h_start = self.manhattan_heuristic(start, goal_row)
-        open_set = [(h_start, 0, start)]
-        
-        # Track visited nodes and their g_scores
-        g_scores = {start: 0}
-        
-        # For path reconstruction
-        came_from = {}
-
-        while open_set:
-            # Get node with lowest f_score
-            f_current, g_current, current = heapq.heappop(open_set)
-            row, col = current
-
-            # Goal check
-            if row == goal_row:
-                if return_path:
-                    # Reconstruct path
-                    path = [current]
-                    while current in came_from:
-                        current = came_from[current]
-                        path.append(current)
-                    path.reverse()
-                    return path
-                else:
-                    return g_current  # Path length
-
-            # Explore neighbors
-            for neigh in self.get_legal_moves(player=player, override_pos=list(current)):
-                neighbor = tuple(neigh)
-                tentative_g = g_current + 1  # Cost to move is always 1
-
-                # If this path to neighbor is better than any previous one
-                if neighbor not in g_scores or tentative_g < g_scores[neighbor]:
-                    # Update path
-                    came_from[neighbor] = current
-                    g_scores[neighbor] = tentative_g
-                    
-                    # Calculate f_score and add to open set
-                    h_score = self.manhattan_heuristic(neighbor, goal_row)
-                    f_score = tentative_g + h_score
-                    heapq.heappush(open_set, (f_score, tentative_g, neighbor))
-
-        # No path found
-        return None
+        cell = next(cell for cell in layers[-1] if cell // self.size == goal_row)
+        self.path = [CELL_COORDS[cell]]
+        while cell in parents:
+            cell = parents[cell]
+            self.path.append(CELL_COORDS[cell])
+        self.path.reverse()
+
+        # Walk back from the goal cells keeping moves into cells already on a path
+        on_path = {cell for cell in layers[-1] if cell // self.size == goal_row}
+        for layer in reversed(layers[:-1]):
+            layer_moves = []
+            must_h = must_v = -1
+            for cell in layer:
+                for move in successors[cell]:
+                    if move in on_path:
+                        frm, to = CELL_COORDS[cell], CELL_COORDS[move]
+                        h_mask, v_mask = self._crossed_edges(frm, to)
+                        layer_moves.append((frm, to, h_mask, v_mask))
+                        must_h &= h_mask
+                        must_v &= v_mask
+                        self.h_edges |= h_mask
+                        self.v_edges |= v_mask
+            self.moves.append(layer_moves)
+            self.must_h_edges |= must_h
+            self.must_v_edges |= must_v
+            on_path = {cell_of(move[0]) for move in layer_moves}
+        self.moves.reverse()
+
+    def _crossed_edges(self, frm, to):
+        dr, dc = to[0] - frm[0], to[1] - frm[1]
+        if abs(dr) + abs(dc) == 1:
+            cells = (frm, to)
+        elif abs(dr) == 2 or abs(dc) == 2:
+            cells = (frm, (frm[0] + dr // 2, frm[1] + dc // 2), to)
+        else:
+            # Diagonal jump around the opponent pawn
+            cells = (frm, self.opponent, to)
+        h_mask = v_mask = 0
+        for (r1, c1), (r2, c2) in zip(cells, cells[1:]):
+            if c1 == c2:
+                h_mask |= 1 << (min(r1, r2) * self.size + c1)
+            else:
+                v_mask |= 1 << (r1 * self.size + min(c1, c2))
+        return h_mask, v_mask
+
+    def is_cut_by(self, row, col, orientation):
+        """
+        Whether a wall there blocks every shortest path. Only such a wall can
+        lengthen the route, so other slots need no further evaluation.
+        """
+        if self.length is None:
+            return False
+        h_mask, v_mask = add_wall_edges(0, 0, row, col, orientation)
+        if not (h_mask & self.h_edges or v_mask & self.v_edges):
+            return False
+        if h_mask & self.must_h_edges or v_mask & self.must_v_edges:
+            return True
+        reached = {self.start}
+        for layer_moves in self.moves:
+            reached = {to for frm, to, h, v in layer_moves
+                       if frm in reached and not (h & h_mask or v & v_mask)}
+            if not reached:
+                return True
+        return False
 
 
 # Backward compatibility alias
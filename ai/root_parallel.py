@@ -0,0 +1,55 @@
+# ai/root_parallel.py
+# Root-parallel search: the root moves of one search are scored in worker
+# processes of a persistent pool, each with a full minimax/expectimax call,
+# and the scores come back in root-move order.
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+# Pools by worker count, kept for the life of the process and shared by
+# every AI that asks for the same number of workers
+_pools = {}
+# Per-worker AI instances, keyed by (class, player id, constructor options),
+# kept so their search and pathfinding caches stay warm between tasks
+_worker_ais = {}
+
+
+def get_pool(workers):
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
+
+
+def _score_root_move(ai_class, player_id, options, board, move, depth):
+    """Worker entry point: (score, nodes, cutoffs) of one root move"""
+    key = (ai_class, player_id, options)
+    if key not in _worker_ais:
+        _worker_ais[key] = ai_class(player_id, **dict(options))
+    ai = _worker_ais[key]
+    score = ai.score_root_move(board, move, depth)
+    return score, ai.nodes, ai.cutoffs
+
+
+def parallel_root_scores(ai, board, moves, depth, workers):
+    """
+    ai's score for each of moves searched to depth, computed on a pool of
+    workers processes; adds the workers' node and cutoff counts to ai's
+    """
+    pool = get_pool(workers)
+    # The workers need the position, not the undo history
+    position = copy.copy(board)
+    options = ai.root_parallel_options()
+    futures = [pool.submit(_score_root_move, type(ai), ai.player_id, options, position, move, depth)
+               for move in moves]
+    scores = []
+    for future in futures:
+        score, nodes, cutoffs = future.result()
+        scores.append(score)
+        ai.nodes += nodes
+        ai.cutoffs += cutoffs
+    return scores
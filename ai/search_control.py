@@ -0,0 +1,36 @@
+# ai/search_control.py
+import time
+
+# Iterative deepening stops here even if time is left
+MAX_ITERATIVE_DEPTH = 32
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget runs out"""
+
+
+class Deadline:
+    """
+    Per-move search budget: a time limit and/or a cap on searched nodes
+    (each check() counts one, searches also add their leaves to nodes);
+    None means no limit
+    """
+
+    def __init__(self, time_limit_ms=None, max_nodes=None):
+        self.end = None if time_limit_ms is None else time.perf_counter() + time_limit_ms / 1000.0
+        self.max_nodes = max_nodes
+        self.nodes = 0
+
+    def active(self):
+        return self.end is not None or self.max_nodes is not None
+
+    def expired(self):
+        """Whether the time limit has passed"""
+        return self.end is not None and time.perf_counter() >= self.end
+
+    def check(self):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchTimeout()
+        if self.end is not None and time.perf_counter() >= self.end:
+            raise SearchTimeout()
@@ -0,0 +1,149 @@
+# ai/transposition.py
+import struct
+import weakref
+from multiprocessing import shared_memory
+
+from game_rules import action_code, code_action
+
+EXACT = 0
+LOWER = 1  # score is a lower bound (search failed high)
+UPPER = 2  # score is an upper bound (search failed low)
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results indexed by Board.zobrist_key().
+    Each slot holds one entry; a new result replaces the old one if the old
+    one is from an earlier search or was searched no deeper.
+    """
+
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Age existing entries so the next search may overwrite them"""
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            # (depth, bound, score, best_move)
+            return entry[1:5]
+        return None
+
+    def store(self, key, depth, bound, score, best_move=None):
+        index = key % self.size
+        old = self.slots[index]
+        if old is not None and old[5] == self.generation and old[1] > depth:
+            return
+        self.slots[index] = (key, depth, bound, score, best_move, self.generation)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.hits = 0
+        self.stores = 0
+
+
+# Shared entries: (check, data, score bits), check = key ^ data ^ score bits.
+# data: depth (bits 0-15), bound (16-23), generation (24-31), best move
+# (32-47, see action_code) and a valid flag (bit 63). The entries follow a
+# header holding the table generation and the helper epoch (see lazy_smp),
+# which only the creating table bumps
+SHARED_HEADER = struct.Struct("<QQ")
+SHARED_ENTRY = struct.Struct("<QQQ")
+_SCORE = struct.Struct("<d")
+_SCORE_BITS = struct.Struct("<Q")
+_VALID = 1 << 63
+
+
+def _release(shm, owner):
+    shm.close()
+    if owner:
+        shm.unlink()
+
+
+class SharedTranspositionTable:
+    """
+    TranspositionTable over a multiprocessing.shared_memory block, so that
+    search processes share results. Entries are fixed-width and written
+    without locks; the check word is the key XORed with the entry's data,
+    so an entry torn by a concurrent write fails verification and reads as
+    a miss. Pass name (and the same size) to attach to an existing table;
+    the creating table owns the generation and unlinks the block when it is
+    garbage collected.
+    Best moves are cell indexes or wall (row, col, orientation) tuples.
+    """
+
+    def __init__(self, size=1 << 16, name=None):
+        self.size = size
+        self.owner = name is None
+        nbytes = SHARED_HEADER.size + size * SHARED_ENTRY.size
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.shm.buf[:nbytes] = bytes(nbytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self._finalizer = weakref.finalize(self, _release, self.shm, self.owner)
+        self.hits = 0
+        self.stores = 0
+
+    @property
+    def generation(self):
+        return SHARED_HEADER.unpack_from(self.buf, 0)[0]
+
+    @property
+    def epoch(self):
+        return SHARED_HEADER.unpack_from(self.buf, 0)[1]
+
+    def new_search(self):
+        """
+        Age existing entries so the next search may overwrite them; only the
+        creating table does, so attached tables follow its searches
+        """
+        if self.owner:
+            SHARED_HEADER.pack_into(self.buf, 0, (self.generation + 1) & 0xff, self.epoch)
+
+    def next_epoch(self):
+        """Advance the helper epoch (creating table only), ending the helper searches of the last one"""
+        if self.owner:
+            SHARED_HEADER.pack_into(self.buf, 0, self.generation, self.epoch + 1)
+
+    def probe(self, key):
+        check, data, score_bits = SHARED_ENTRY.unpack_from(
+            self.buf, SHARED_HEADER.size + (key % self.size) * SHARED_ENTRY.size)
+        if not data & _VALID or check ^ data ^ score_bits != key:
+            return None
+        self.hits += 1
+        # (depth, bound, score, best_move)
+        return (data & 0xffff, (data >> 16) & 0xff, _SCORE.unpack(_SCORE_BITS.pack(score_bits))[0],
+                code_action((data >> 32) & 0xffff))
+
+    def store(self, key, depth, bound, score, best_move=None):
+        offset = SHARED_HEADER.size + (key % self.size) * SHARED_ENTRY.size
+        _, old, _ = SHARED_ENTRY.unpack_from(self.buf, offset)
+        generation = self.generation
+        if old & _VALID and (old >> 24) & 0xff == generation and old & 0xffff > depth:
+            return
+        data = _VALID | depth | bound << 16 | generation << 24 | action_code(best_move) << 32
+        score_bits = _SCORE_BITS.unpack(_SCORE.pack(score))[0]
+        SHARED_ENTRY.pack_into(self.buf, offset, key ^ data ^ score_bits, data, score_bits)
+        self.stores += 1
+
+    def clear(self):
+        nbytes = self.size * SHARED_ENTRY.size
+        self.buf[SHARED_HEADER.size:SHARED_HEADER.size + nbytes] = bytes(nbytes)
+        self.hits = 0
+        self.stores = 0
+
+    def close(self):
+        """Detach now (and unlink, for the creating table)"""
+        self.buf = None
+        self._finalizer()
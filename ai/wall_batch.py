@@ -0,0 +1,150 @@
+# ai/wall_batch.py
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; WallImpacts then searches one wall at a time
+    np = None
+
+from ai.distance_maps import DistanceMapCache
+from ai.pathfinding import find_path_length
+from game_rules import BOARD_SIZE, CELL_COORDS, CELL_NEIGHBOURS, WALL_SLOT_NAMES, add_wall_edges, wall_slot
+
+CELLS = BOARD_SIZE * BOARD_SIZE
+
+# Distance queries answered one wall at a time before WallImpacts switches to
+# the batched BFS, which costs about as much as a few dozen single searches
+BATCH_AFTER = 32
+
+
+def _bits_to_array(mask):
+    raw = np.frombuffer(mask.to_bytes((CELLS + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:CELLS].astype(bool)
+
+
+if np is not None:
+    # SLOT_H_EDGES[k] / SLOT_V_EDGES[k]: edges blocked by a wall in slot k
+    SLOT_H_EDGES = np.zeros((len(WALL_SLOT_NAMES), CELLS), dtype=bool)
+    SLOT_V_EDGES = np.zeros((len(WALL_SLOT_NAMES), CELLS), dtype=bool)
+    for _slot, (_r, _c, _o) in enumerate(WALL_SLOT_NAMES):
+        _h, _v = add_wall_edges(0, 0, _r, _c, _o)
+        SLOT_H_EDGES[_slot] = _bits_to_array(_h)
+        SLOT_V_EDGES[_slot] = _bits_to_array(_v)
+    LAST_ROW = np.arange(CELLS) >= CELLS - BOARD_SIZE
+    LAST_COL = np.arange(CELLS) % BOARD_SIZE == BOARD_SIZE - 1
+
+
+def batch_goal_distances(open_down, open_right, goal_row):
+    """
+    Reverse BFS from goal_row over a stack of boards at once.
+    open_down[k, i] / open_right[k, i] say whether cell i connects to the cell
+    below / to the right on board k. Returns (K, CELLS) int16, -1 if unreachable.
+    """
+    dist = np.full(open_down.shape, -1, dtype=np.int16)
+    frontier = np.zeros(open_down.shape, dtype=bool)
+    frontier[:, goal_row * BOARD_SIZE:(goal_row + 1) * BOARD_SIZE] = True
+    visited = frontier.copy()
+    step = 0
+    while frontier.any():
+        dist[frontier] = step
+        grown = np.zeros_like(frontier)
+        grown[:, :-BOARD_SIZE] |= frontier[:, BOARD_SIZE:] & open_down[:, :-BOARD_SIZE]
+        grown[:, BOARD_SIZE:] |= frontier[:, :-BOARD_SIZE] & open_down[:, :-BOARD_SIZE]
+        grown[:, :-1] |= frontier[:, 1:] & open_right[:, :-1]
+        grown[:, 1:] |= frontier[:, :-1] & open_right[:, :-1]
+        frontier = grown & ~visited
+        visited |= frontier
+        step += 1
+    return dist
+
+
+class WallImpactEngine:
+    """
+    Computes every player's goal distance after each possible wall in one
+    batched BFS (see WallImpacts). Without NumPy the same queries are
+    answered one wall at a time.
+    """
+
+    def __init__(self):
+        self.distance_maps = DistanceMapCache()
+
+    def evaluate(self, board):
+        return WallImpacts(self, board)
+
+
+class WallImpacts:
+    """
+    Wall legality and resulting distances for one board position. The
+    batched BFS only runs once more than BATCH_AFTER walls have been asked
+    about, since callers usually filter candidates down to a few.
+    """
+
+    def __init__(self, engine, board):
+        self.engine = engine
+        self.board = board
+        self.distances = {}
+        self.maps = None
+
+    def _batch_maps(self):
+        if self.maps is None and np is not None:
+            board = self.board
+            down = SLOT_H_EDGES | _bits_to_array(board.h_edges)
+            right = SLOT_V_EDGES | _bits_to_array(board.v_edges)
+            open_down = ~down & ~LAST_ROW
+            open_right = ~right & ~LAST_COL
+            self.maps = {1: batch_goal_distances(open_down, open_right, 0),
+                         2: batch_goal_distances(open_down, open_right, BOARD_SIZE - 1)}
+        return self.maps
+
+    def is_legal(self, row, col, orientation):
+        """Same answer as board.is_valid_wall(row, col, orientation)"""
+        if self.maps is None:
+            return self.board.is_valid_wall(row, col, orientation)
+        if not (0 <= row < BOARD_SIZE - 1 and 0 <= col < BOARD_SIZE - 1):
+            return False
+        slot = wall_slot(row, col, orientation)
+        if not (self.board.open_slots >> slot) & 1:
+            return False
+        for player in (1, 2):
+            if self.maps[player][slot, self.board.pawn_cell(player)] < 0:
+                return False
+        return True
+
+    def distance(self, row, col, orientation, player):
+        """
+        Shortest path length for player once this (legal) wall is placed,
+        matching find_path_length on the resulting board
+        """
+        key = (row, col, orientation, player)
+        if key not in self.distances:
+            self.distances[key] = self._distance(row, col, orientation, player)
+        return self.distances[key]
+
+    def _distance(self, row, col, orientation, player):
+        board = self.board
+        if len(self.distances) >= BATCH_AFTER:
+            self._batch_maps()
+        if self.maps is None:
+            board.push_wall(player, row, col, orientation, trusted=True)
+            dist = self.engine.distance_maps.distance(board, player)
+            board.undo()
+            return dist
+
+        dist_map = self.maps[player][wall_slot(row, col, orientation)]
+        cell = board.pawn_cell(player)
+        dist = int(dist_map[cell])
+        if dist < 0:
+            return None
+        if dist == 0:
+            return 0
+        # Jump-rule correction as in DistanceMapCache.distance
+        r, c = CELL_COORDS[cell]
+        opp = board.opponent_cell(player)
+        for zone in (opp,) + CELL_NEIGHBOURS[opp]:
+            zone_dist = int(dist_map[zone])
+            if zone_dist >= 0:
+                zr, zc = CELL_COORDS[zone]
+                if abs(zr - r) + abs(zc - c) + zone_dist <= dist:
+                    board.push_wall(player, row, col, orientation, trusted=True)
+                    dist = find_path_length(board, player)
+                    board.undo()
+                    return dist
+        return dist
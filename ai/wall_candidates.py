@@ -0,0 +1,37 @@
+# ai/wall_candidates.py
+from game_rules import CELL_COORDS, H_EDGE_SLOTS, V_EDGE_SLOTS, WALL_SLOT_NAMES
+
+
+def path_cutting_walls(board, dist_map, player, limit):
+    """
+    Up to limit legal walls that cut player's shortest route to goal, nearest
+    its pawn first. The route follows dist_map (a DistanceMapCache map for
+    player) downhill from the pawn; each step adds the slots blocking it.
+    """
+    size = board.size
+    r, c = CELL_COORDS[board.pawn_cell(player)]
+    dist = dist_map[r * size + c]
+    walls = []
+    seen = 0
+    while dist:
+        cell = r * size + c
+        if r > 0 and dist_map[cell - size] == dist - 1 and not (board.h_edges >> (cell - size)) & 1:
+            r, slots = r - 1, H_EDGE_SLOTS[cell - size]
+        elif r < size - 1 and dist_map[cell + size] == dist - 1 and not (board.h_edges >> cell) & 1:
+            r, slots = r + 1, H_EDGE_SLOTS[cell]
+        elif c > 0 and dist_map[cell - 1] == dist - 1 and not (board.v_edges >> (cell - 1)) & 1:
+            c, slots = c - 1, V_EDGE_SLOTS[cell - 1]
+        else:
+            c, slots = c + 1, V_EDGE_SLOTS[cell]
+        dist -= 1
+
+        for slot in slots:
+            if (seen >> slot) & 1:
+                continue
+            seen |= 1 << slot
+            row, col, orientation = WALL_SLOT_NAMES[slot]
+            if board.is_valid_wall(row, col, orientation):
+                walls.append(WALL_SLOT_NAMES[slot])
+                if len(walls) >= limit:
+                    return walls
+    return walls
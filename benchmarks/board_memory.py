@@ -0,0 +1,93 @@
+"""
+Measure the memory of stored positions: the compact __slots__ Board copied
+with copy.copy, against the earlier layout (list positions and a list of
+wall tuples in a plain object) copied with copy.deepcopy as clone() did.
+
+    python benchmarks/board_memory.py --positions 20000
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_rules import Board, BOARD_SIZE
+
+
+class LegacyBoard:
+    """Board state in its earlier layout, for comparison"""
+
+    def __init__(self, board):
+        self.size = board.size
+        self.p1_pos = board.p1_pos
+        self.p2_pos = board.p2_pos
+        self.walls = board.walls
+        self.h_edges = board.h_edges
+        self.v_edges = board.v_edges
+        self.wall_points = board.wall_point_mask
+        self.open_slots = board.open_slots
+        self.p1_walls_remaining = board.p1_walls_remaining
+        self.p2_walls_remaining = board.p2_walls_remaining
+        self.distance_fields = {}
+        self.history = []
+        self.zobrist = board.zobrist
+
+
+def random_positions(rng, count):
+    """Positions from random games: a random wall 30% of the time, else a random pawn move"""
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        player = 1
+        while len(positions) < count:
+            if rng.random() < 0.3 and board.get_walls_remaining(player) > 0:
+                if not board.place_wall(player, rng.randrange(BOARD_SIZE - 1),
+                                        rng.randrange(BOARD_SIZE - 1), rng.choice("HV")):
+                    continue
+            else:
+                moves = board.get_legal_moves(player)
+                if not moves:
+                    # A boxed-in pawn ends the game; start another
+                    break
+                board.apply_move(player, rng.choice(moves))
+            positions.append(copy.copy(board))
+            if board.p1_cell // board.size == 0 or board.p2_cell // board.size == board.size - 1:
+                break
+            player = 3 - player
+    return positions
+
+
+def store(states, copier):
+    """(bytes per stored copy, copies per second)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    stored = [copier(state) for state in states]
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del stored
+    return used / len(states), len(states) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per stored position, before and after")
+    parser.add_argument("--positions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    boards = random_positions(random.Random(args.seed), args.positions)
+    legacy = [LegacyBoard(board) for board in boards]
+
+    for label, states, copier in (("before (dict, lists, deepcopy)", legacy, copy.deepcopy),
+                                  ("after  (__slots__, copy.copy)", boards, copy.copy)):
+        size, rate = store(states, copier)
+        print(f"{label}: {size:8.0f} bytes/position {rate:10.0f} copies/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Time MCTSPlayer: bare rollouts per second from random positions, and full
+UCT playouts (selection, expansion, rollout, backpropagation) per second,
+to see how many fit in a turn.
+
+    python benchmarks/mcts_rollouts.py --turn-ms 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board_memory import random_positions
+from ai.mcts_player import MCTSPlayer
+
+
+def rollout_rate(player, boards, rollouts):
+    start = time.perf_counter()
+    for i in range(rollouts):
+        board = boards[i % len(boards)]
+        player._rollout(board, 1 + i % 2)
+    return rollouts / (time.perf_counter() - start)
+
+
+def playout_rate(player_class, boards, iterations):
+    """Playouts per second of a fresh search from each board"""
+    playouts = 0
+    start = time.perf_counter()
+    for i, board in enumerate(boards):
+        player = player_class(1 + i % 2, iterations=iterations)
+        player.choose_move(board)
+        playouts += player.playouts
+    return playouts / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS rollout and playout throughput")
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--rollouts", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=500, help="playouts per searched position")
+    parser.add_argument("--searches", type=int, default=20, help="positions searched for the playout rate")
+    parser.add_argument("--turn-ms", type=float, default=1000, help="turn budget to size against")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    boards = [board for board in random_positions(random.Random(args.seed), args.positions * 3)
+              if board.p1_cell // board.size != 0 and board.p2_cell // board.size != board.size - 1]
+    boards = boards[::3][:args.positions]
+
+    rollouts = rollout_rate(MCTSPlayer(1), boards, args.rollouts)
+    playouts = playout_rate(MCTSPlayer, boards[:args.searches], args.iterations)
+    print(f"rollouts: {rollouts:10.0f} /s")
+    print(f"playouts: {playouts:10.0f} /s  (~{playouts * args.turn_ms / 1000:.0f} per {args.turn_ms:.0f} ms turn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Check that every pathfinding backend finds the same distances as A* on
+random positions, then time each of them.
+
+    python benchmarks/pathfinding_backends.py --positions 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_rules import Board, BOARD_SIZE
+from ai.pathfinding import PATH_BACKENDS, find_path, find_path_length
+
+
+def random_board(rng):
+    board = Board()
+    for _ in range(rng.randint(0, 20)):
+        board.place_wall(rng.choice((1, 2)), rng.randrange(BOARD_SIZE - 1),
+                         rng.randrange(BOARD_SIZE - 1), rng.choice("HV"))
+    board.p1_pos = [rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE)]
+    # Half the time put the pawns side by side so jumps come into play
+    r, c = board.p1_pos
+    neighbours = [[r + dr, c + dc] for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                  if 0 <= r + dr < BOARD_SIZE and 0 <= c + dc < BOARD_SIZE]
+    while True:
+        if rng.random() < 0.5:
+            board.p2_pos = rng.choice(neighbours)
+        else:
+            board.p2_pos = [rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE)]
+        if board.p2_pos != board.p1_pos:
+            return board
+
+
+def check(boards):
+    """Number of (board, player, heuristic) cases where a backend disagrees with A*"""
+    mismatches = 0
+    for board in boards:
+        for player in (1, 2):
+            for dist_map in (None, board.goal_distances(player)):
+                expected = find_path_length(board, player, dist_map)
+                for backend in PATH_BACKENDS:
+                    length = find_path_length(board, player, dist_map, backend)
+                    path = find_path(board, player, dist_map, backend)
+                    if length != expected or (path is None) != (expected is None) or \
+                            (path is not None and len(path) - 1 != expected):
+                        mismatches += 1
+    return mismatches
+
+
+def bench(boards, backend, use_maps):
+    calls = 0
+    start = time.perf_counter()
+    for board in boards:
+        for player in (1, 2):
+            dist_map = board.goal_distances(player) if use_maps else None
+            find_path_length(board, player, dist_map, backend)
+            calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pathfinding backends")
+    parser.add_argument("--positions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    boards = [random_board(rng) for _ in range(args.positions)]
+
+    mismatches = check(boards)
+    print(f"equivalence: {mismatches} mismatches over {args.positions} positions")
+
+    for use_maps in (False, True):
+        label = "distance-map heuristic" if use_maps else "row-distance heuristic"
+        for backend in PATH_BACKENDS:
+            print(f"{backend:>6} ({label}): {bench(boards, backend, use_maps):10.0f} calls/s")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
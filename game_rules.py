@@ -1,113 +1,495 @@
-from ai.pathfinding import AStarPathfinder
 import copy
+import heapq
+import random
+from collections import deque
 
 class Board:
+    # Compact state: small ints and fixed-width bitsets, so stored positions
+    # stay small and copy.copy() is cheap (see __copy__)
+    __slots__ = ("size", "p1_cell", "p2_cell", "p1_wall_slots", "p2_wall_slots",
+                 "p1_walls_remaining", "p2_walls_remaining", "h_edges", "v_edges",
+                 "wall_point_mask", "open_slots", "distance_fields", "history", "zobrist")
+
     def __init__(self):
         self.size = BOARD_SIZE
-        self.p1_pos = [self.size - 1, self.size // 2]
-        self.p2_pos = [0, self.size // 2]
-        self.walls = []
+        # Pawns as cell indexes (see cell_of); p1_pos/p2_pos give [row, col]
+        self.p1_cell = cell_of((self.size - 1, self.size // 2))
+        self.p2_cell = cell_of((0, self.size // 2))
+        # Bit wall_slot(row, col, orientation) is set for each wall a player
+        # placed; walls lists them
+        self.p1_wall_slots = 0
+        self.p2_wall_slots = 0
+        # Blocked-edge bitmasks, kept in sync with the wall slots by place_wall
+        self.h_edges = 0
+        self.v_edges = 0
+        # Wall endpoints/midpoints on the grid-line lattice (see wall_points)
+        self.wall_point_mask = 0
+        # Bit wall_slot(row, col, orientation) is set while that slot is
+        # geometrically free; placing a wall clears its WALL_CONFLICTS
+        self.open_slots = ALL_WALL_SLOTS
         self.p1_walls_remaining = 10
         self.p2_walls_remaining = 10
+        # Last goal-distance map computed per player: player -> (h_edges,
+        # v_edges, map). Replaced, never mutated, so undo can restore it
+        self.distance_fields = {}
+        # Undo stack for push_move/push_wall
+        self.history = []
+        # Zobrist hash of pawns, walls and walls remaining (see zobrist_key)
+        self.zobrist = (ZOBRIST_PAWN[1][self.p1_cell]
+                        ^ ZOBRIST_PAWN[2][self.p2_cell]
+                        ^ ZOBRIST_WALLS_LEFT[1][self.p1_walls_remaining]
+                        ^ ZOBRIST_WALLS_LEFT[2][self.p2_walls_remaining])
+
+    def __copy__(self):
+        """Same position with an empty undo history"""
+        board = Board.__new__(Board)
+        board.size = self.size
+        board.p1_cell = self.p1_cell
+        board.p2_cell = self.p2_cell
+        board.p1_wall_slots = self.p1_wall_slots
+        board.p2_wall_slots = self.p2_wall_slots
+        board.p1_walls_remaining = self.p1_walls_remaining
+        board.p2_walls_remaining = self.p2_walls_remaining
+        board.h_edges = self.h_edges
+        board.v_edges = self.v_edges
+        board.wall_point_mask = self.wall_point_mask
+        board.open_slots = self.open_slots
+        # Replaced, never mutated, so sharing it is safe
+        board.distance_fields = self.distance_fields
+        board.history = []
+        board.zobrist = self.zobrist
+        return board
+
+    @property
+    def walls(self):
+        """Placed walls as (row, col, orientation, player), in slot order"""
+        walls = []
+        slots = self.p1_wall_slots | self.p2_wall_slots
+        while slots:
+            low = slots & -slots
+            row, col, orientation = WALL_SLOT_NAMES[low.bit_length() - 1]
+            walls.append((row, col, orientation, 1 if low & self.p1_wall_slots else 2))
+            slots ^= low
+        return walls
+
+    @property
+    def p1_pos(self):
+        return list(CELL_COORDS[self.p1_cell])
+
+    @p1_pos.setter
+    def p1_pos(self, pos):
+        self.apply_move_cell(1, cell_of(pos))
+
+    @property
+    def p2_pos(self):
+        return list(CELL_COORDS[self.p2_cell])
+
+    @p2_pos.setter
+    def p2_pos(self, pos):
+        self.apply_move_cell(2, cell_of(pos))
+
+    def pawn_cell(self, player):
+        return self.p1_cell if player == 1 else self.p2_cell
+
+    def opponent_cell(self, player):
+        return self.p2_cell if player == 1 else self.p1_cell
 
     def get_pawn_position(self, player):
-        return self.p1_pos if player == 1 else self.p2_pos
+        return list(CELL_COORDS[self.pawn_cell(player)])
 
     def get_opponent_position(self, player):
-        return self.p2_pos if player == 1 else self.p1_pos
+        return list(CELL_COORDS[self.opponent_cell(player)])
 
     def get_legal_moves(self, player, override_pos=None):
-        pos = override_pos or self.get_pawn_position(player)
-        opp = self.get_opponent_position(player)
-        return get_legal_moves(pos, opp, self.walls)
+        cell = cell_of(override_pos) if override_pos else self.pawn_cell(player)
+        return [list(CELL_COORDS[move]) for move in self.legal_move_cells(player, cell)]
+
+    def legal_move_cells(self, player, from_cell=None):
+        """get_legal_moves as cell indexes, for searches"""
+        if from_cell is None:
+            from_cell = self.pawn_cell(player)
+        return legal_move_cells(from_cell, self.opponent_cell(player), self.h_edges, self.v_edges)
 
     def is_valid_wall(self, row, col, orientation):
-        if not is_valid_wall(row, col, orientation, self.walls):
+        if not (0 <= row < self.size - 1 and 0 <= col < self.size - 1):
             return False
-        # Temporarily add wall and check if paths to goals still exist for both players
-        temp_walls = self.walls + [(row, col, orientation, 0)]
-        def temp_legal(player, override_pos=None):
-            pos = override_pos or self.get_pawn_position(player)
-            opp = self.get_opponent_position(player)
-            return get_legal_moves(pos, opp, temp_walls)
-        pathfinder = AStarPathfinder(temp_legal)
-        if pathfinder.find_path_length(self, 1) is None or pathfinder.find_path_length(self, 2) is None:
+        if not (self.open_slots >> wall_slot(row, col, orientation)) & 1:
             return False
-        return True
+        # A wall touching other walls and the board edge at fewer than two
+        # lattice points cannot close off a region, so no path can be cut
+        touching = wall_points(row, col, orientation) & (self.wall_point_mask | BORDER_POINTS)
+        if bin(touching).count("1") < 2:
+            return True
+        # Temporarily add wall and check if paths to goals still exist for both players
+        h_edges, v_edges = add_wall_edges(self.h_edges, self.v_edges, row, col, orientation)
+        return (goal_reachable(CELL_COORDS[self.p1_cell], 0, h_edges, v_edges)
+                and goal_reachable(CELL_COORDS[self.p2_cell], self.size - 1, h_edges, v_edges))
 
-    def place_wall(self, player, row, col, orientation):
-        if self.is_valid_wall(row, col, orientation):
-            self.walls.append((row, col, orientation, player))
-            if player == 1:
-                self.p1_walls_remaining -= 1
-            else:
-                self.p2_walls_remaining -= 1
+    def place_wall(self, player, row, col, orientation, trusted=False):
+        """Place a wall; trusted=True skips the check for an already validated slot"""
+        if trusted or self.is_valid_wall(row, col, orientation):
+            self._add_wall(player, row, col, orientation)
             return True
         return False
 
+    def open_wall_slots(self):
+        """Yield (row, col, orientation) for each geometrically free slot, row-major, H before V"""
+        slots = self.open_slots
+        while slots:
+            low = slots & -slots
+            yield WALL_SLOT_NAMES[low.bit_length() - 1]
+            slots ^= low
+
+    def _add_wall(self, player, row, col, orientation):
+        slot = wall_slot(row, col, orientation)
+        self.h_edges, self.v_edges = add_wall_edges(self.h_edges, self.v_edges, row, col, orientation)
+        self.wall_point_mask |= wall_points(row, col, orientation)
+        self.open_slots &= ~WALL_CONFLICTS[slot]
+        remaining = self.get_walls_remaining(player)
+        self.zobrist ^= (ZOBRIST_WALL[(row, col, orientation)]
+                         ^ ZOBRIST_WALLS_LEFT[player][remaining]
+                         ^ ZOBRIST_WALLS_LEFT[player][remaining - 1])
+        if player == 1:
+            self.p1_wall_slots |= 1 << slot
+            self.p1_walls_remaining -= 1
+        else:
+            self.p2_wall_slots |= 1 << slot
+            self.p2_walls_remaining -= 1
+
+    def goal_distances(self, player):
+        """
+        Goal-distance map for player under the current walls (see
+        goal_distance_map). Walls are only ever added between undos, so the
+        last map is usually repaired around the new walls, not recomputed.
+        """
+        h_edges, v_edges = self.h_edges, self.v_edges
+        dist_map = None
+        field = self.distance_fields.get(player)
+        if field is not None:
+            old_h, old_v, old_map = field
+            if old_h == h_edges and old_v == v_edges:
+                return old_map
+            if not (old_h & ~h_edges or old_v & ~v_edges):
+                dist_map = repair_goal_distance_map(old_map, h_edges, v_edges,
+                                                    h_edges & ~old_h, v_edges & ~old_v)
+        if dist_map is None:
+            dist_map = goal_distance_map(0 if player == 1 else self.size - 1, h_edges, v_edges)
+        self.distance_fields = {**self.distance_fields, player: (h_edges, v_edges, dist_map)}
+        return dist_map
+
     def get_walls_remaining(self, player):
         return self.p1_walls_remaining if player == 1 else self.p2_walls_remaining
 
     def apply_move(self, player, move):
+        self.apply_move_cell(player, cell_of(move))
+
+    def apply_move_cell(self, player, cell):
+        self.zobrist ^= ZOBRIST_PAWN[player][self.pawn_cell(player)] ^ ZOBRIST_PAWN[player][cell]
         if player == 1:
-            self.p1_pos = list(move)
+            self.p1_cell = cell
+        else:
+            self.p2_cell = cell
+
+    def zobrist_key(self, to_move):
+        """Position hash including the side to move, for transposition tables"""
+        return self.zobrist ^ ZOBRIST_SIDE[to_move]
+
+    def push_move(self, player, move):
+        """Apply a pawn move in place; undo() takes it back"""
+        self.push_move_cell(player, cell_of(move))
+
+    def push_move_cell(self, player, cell):
+        self.history.append(("move", player, self.pawn_cell(player), None, self.zobrist))
+        self.apply_move_cell(player, cell)
+
+    def push_wall(self, player, row, col, orientation, trusted=False):
+        """Place a wall in place if legal; undo() takes it back"""
+        if not trusted and not self.is_valid_wall(row, col, orientation):
+            return False
+        self.history.append(("wall", player, wall_slot(row, col, orientation),
+                             (self.h_edges, self.v_edges, self.wall_point_mask, self.open_slots,
+                              self.distance_fields), self.zobrist))
+        self._add_wall(player, row, col, orientation)
+        return True
+
+    def undo(self):
+        # index is the pawn's previous cell for moves, the wall slot for walls
+        kind, player, index, wall_state, self.zobrist = self.history.pop()
+        if kind == "move":
+            if player == 1:
+                self.p1_cell = index
+            else:
+                self.p2_cell = index
         else:
-            self.p2_pos = list(move)
+            (self.h_edges, self.v_edges, self.wall_point_mask, self.open_slots,
+             self.distance_fields) = wall_state
+            if player == 1:
+                self.p1_wall_slots &= ~(1 << index)
+                self.p1_walls_remaining += 1
+            else:
+                self.p2_wall_slots &= ~(1 << index)
+                self.p2_walls_remaining += 1
 
     def clone(self):
-        return copy.deepcopy(self)
+        return copy.copy(self)
 
 BOARD_SIZE = 9
 
-def is_blocked(r1, c1, r2, c2, walls):
+# Zobrist keys; a fixed seed keeps hashes stable across processes and runs
+_zobrist_rng = random.Random(0x5155)
+ZOBRIST_PAWN = {p: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)] for p in (1, 2)}
+ZOBRIST_WALL = {(r, c, o): _zobrist_rng.getrandbits(64)
+                for r in range(BOARD_SIZE - 1) for c in range(BOARD_SIZE - 1) for o in 'HV'}
+ZOBRIST_WALLS_LEFT = {p: [_zobrist_rng.getrandbits(64) for _ in range(11)] for p in (1, 2)}
+ZOBRIST_SIDE = {p: _zobrist_rng.getrandbits(64) for p in (1, 2)}
+
+# Edge bitmasks: bit (r * BOARD_SIZE + c) of h_edges blocks the step between
+# (r, c) and (r + 1, c); the same bit of v_edges blocks (r, c) <-> (r, c + 1).
+
+def add_wall_edges(h_edges, v_edges, row, col, orientation):
+    """Return (h_edges, v_edges) with the edges covered by one wall set"""
+    if orientation == 'H':
+        # H wall blocks vertical movement between rows row - 1 and row
+        if 0 < row < BOARD_SIZE:
+            for c in (col, col + 1):
+                if 0 <= c < BOARD_SIZE:
+                    h_edges |= 1 << ((row - 1) * BOARD_SIZE + c)
+    elif orientation == 'V':
+        # V wall blocks horizontal movement between cols col - 1 and col
+        if 0 < col < BOARD_SIZE:
+            for r in (row, row + 1):
+                if 0 <= r < BOARD_SIZE:
+                    v_edges |= 1 << (r * BOARD_SIZE + col - 1)
+    return h_edges, v_edges
+
+# Integer cell index: cell = row * BOARD_SIZE + col
+CELL_COORDS = [divmod(_cell, BOARD_SIZE) for _cell in range(BOARD_SIZE * BOARD_SIZE)]
+
+def cell_of(pos):
+    return pos[0] * BOARD_SIZE + pos[1]
+
+def _edge_masks(r1, c1, r2, c2):
+    """(h_mask, v_mask) with the one bit of the edge between two adjacent cells"""
+    if c1 == c2:
+        return 1 << (min(r1, r2) * BOARD_SIZE + c1), 0
+    return 0, 1 << (r1 * BOARD_SIZE + min(c1, c2))
+
+def _on_board(r, c):
+    return 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE
+
+# CELL_STEPS[cell]: one entry per on-board direction (down, up, right, left):
+# (step, step_h, step_v, jump, jump_h, jump_v, sides). step is the adjacent
+# cell, jump the cell beyond it (-1 off the board) and sides the (cell, h, v)
+# targets of an L-shaped jump; *_h/*_v are the edge bits each move crosses
+CELL_STEPS = []
+for _r, _c in CELL_COORDS:
+    _steps = []
+    for _dr, _dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        _nr, _nc = _r + _dr, _c + _dc
+        if not _on_board(_nr, _nc):
+            continue
+        _jr, _jc = _nr + _dr, _nc + _dc
+        _jump, _jump_h, _jump_v = -1, 0, 0
+        if _on_board(_jr, _jc):
+            _jump = cell_of((_jr, _jc))
+            _jump_h, _jump_v = _edge_masks(_nr, _nc, _jr, _jc)
+        _sides = []
+        for _pdr, _pdc in ((0, 1), (0, -1)) if _dc == 0 else ((1, 0), (-1, 0)):
+            _sr, _sc = _nr + _pdr, _nc + _pdc
+            if _on_board(_sr, _sc):
+                _sides.append((cell_of((_sr, _sc)),) + _edge_masks(_nr, _nc, _sr, _sc))
+        _steps.append((cell_of((_nr, _nc)),) + _edge_masks(_r, _c, _nr, _nc)
+                      + (_jump, _jump_h, _jump_v, tuple(_sides)))
+    CELL_STEPS.append(tuple(_steps))
+
+# CELL_NEIGHBOURS[cell]: adjacent cells, down, up, right, left
+CELL_NEIGHBOURS = [tuple(_step[0] for _step in _steps) for _steps in CELL_STEPS]
+
+def wall_edge_masks(walls):
+    h_edges = v_edges = 0
     for (wall_row, wall_col, orientation, _) in walls:
-        if orientation == 'H':
-            # H wall blocks vertical movement
-            if abs(r1 - r2) == 1 and c1 == c2:
-                crossing_row = max(r1, r2)
-                if crossing_row == wall_row:
-                    # Check if the column is affected by this wall
-                    if c1 == wall_col or c1 == wall_col + 1:
-                        return True
-        elif orientation == 'V':
-            # V wall blocks horizontal movement
-            if abs(c1 - c2) == 1 and r1 == r2:
-                crossing_col = max(c1, c2)
-                if crossing_col == wall_col:
-                    # Check if the row is affected by this wall
-                    if r1 == wall_row or r1 == wall_row + 1:
-                        return True
+        h_edges, v_edges = add_wall_edges(h_edges, v_edges, wall_row, wall_col, orientation)
+    return h_edges, v_edges
+
+def is_edge_blocked(r1, c1, r2, c2, h_edges, v_edges):
+    if c1 == c2 and abs(r1 - r2) == 1:
+        return (h_edges >> (min(r1, r2) * BOARD_SIZE + c1)) & 1 == 1
+    if r1 == r2 and abs(c1 - c2) == 1:
+        return (v_edges >> (r1 * BOARD_SIZE + min(c1, c2))) & 1 == 1
     return False
 
-def get_legal_moves(pawn_pos, opponent_pos, walls):
+# Lattice of grid-line intersections: point (x, y) is bit y * (BOARD_SIZE + 1) + x,
+# with x the column line and y the row line
+LATTICE_SIZE = BOARD_SIZE + 1
+BORDER_POINTS = 0
+for _i in range(LATTICE_SIZE):
+    for _point in ((0, _i), (BOARD_SIZE, _i), (_i, 0), (_i, BOARD_SIZE)):
+        BORDER_POINTS |= 1 << (_point[1] * LATTICE_SIZE + _point[0])
+
+def wall_points(row, col, orientation):
+    """Bitmask of the three lattice points a wall covers"""
+    if orientation == 'H':
+        return 0b111 << (row * LATTICE_SIZE + col)
+    return (1 | 1 << LATTICE_SIZE | 1 << 2 * LATTICE_SIZE) << (row * LATTICE_SIZE + col)
+
+# Cell masks for flood fills
+ALL_CELLS = (1 << BOARD_SIZE * BOARD_SIZE) - 1
+LAST_COL_CELLS = 0
+for _r in range(BOARD_SIZE):
+    LAST_COL_CELLS |= 1 << (_r * BOARD_SIZE + BOARD_SIZE - 1)
+NOT_LAST_ROW_CELLS = (1 << (BOARD_SIZE - 1) * BOARD_SIZE) - 1
+
+def goal_reachable(pos, goal_row, h_edges, v_edges):
+    """Bit-parallel flood fill from pos; True if any goal_row cell is reached (pawns ignored)"""
+    goal = ((1 << BOARD_SIZE) - 1) << (goal_row * BOARD_SIZE)
+    down = ~h_edges & NOT_LAST_ROW_CELLS
+    right = ~v_edges & ALL_CELLS & ~LAST_COL_CELLS
+    reach = 1 << (pos[0] * BOARD_SIZE + pos[1])
+    while not reach & goal:
+        grown = (reach
+                 | (reach & down) << BOARD_SIZE
+                 | (reach >> BOARD_SIZE) & down
+                 | (reach & right) << 1
+                 | (reach >> 1) & right)
+        if grown == reach:
+            return False
+        reach = grown
+    return True
+
+def _open_neighbours(cell, h_edges, v_edges):
+    row, col = divmod(cell, BOARD_SIZE)
+    neighbours = []
+    if row > 0 and not (h_edges >> (cell - BOARD_SIZE)) & 1:
+        neighbours.append(cell - BOARD_SIZE)
+    if row < BOARD_SIZE - 1 and not (h_edges >> cell) & 1:
+        neighbours.append(cell + BOARD_SIZE)
+    if col > 0 and not (v_edges >> (cell - 1)) & 1:
+        neighbours.append(cell - 1)
+    if col < BOARD_SIZE - 1 and not (v_edges >> cell) & 1:
+        neighbours.append(cell + 1)
+    return neighbours
+
+def goal_distance_map(goal_row, h_edges, v_edges):
+    """
+    Flat list of BOARD_SIZE * BOARD_SIZE step counts to goal_row (None where
+    unreachable), ignoring pawns: one reverse BFS from the goal row
+    """
+    dist_map = [None] * (BOARD_SIZE * BOARD_SIZE)
+    queue = deque()
+    for col in range(BOARD_SIZE):
+        cell = goal_row * BOARD_SIZE + col
+        dist_map[cell] = 0
+        queue.append(cell)
+
+    # Unblocked edges are symmetric, so BFS outward from the goal row
+    size = BOARD_SIZE
+    while queue:
+        cell = queue.popleft()
+        row, col = divmod(cell, size)
+        next_dist = dist_map[cell] + 1
+        if row > 0 and not (h_edges >> (cell - size)) & 1 and dist_map[cell - size] is None:
+            dist_map[cell - size] = next_dist
+            queue.append(cell - size)
+        if row < size - 1 and not (h_edges >> cell) & 1 and dist_map[cell + size] is None:
+            dist_map[cell + size] = next_dist
+            queue.append(cell + size)
+        if col > 0 and not (v_edges >> (cell - 1)) & 1 and dist_map[cell - 1] is None:
+            dist_map[cell - 1] = next_dist
+            queue.append(cell - 1)
+        if col < size - 1 and not (v_edges >> cell) & 1 and dist_map[cell + 1] is None:
+            dist_map[cell + 1] = next_dist
+            queue.append(cell + 1)
+    return dist_map
+
+# Above this many affected cells a full BFS is cheaper than a repair
+MAX_REPAIR_CELLS = 24
+
+def repair_goal_distance_map(dist_map, h_edges, v_edges, new_h_edges, new_v_edges):
+    """
+    dist_map updated for the edges in new_h_edges/new_v_edges having been
+    blocked (h_edges/v_edges already include them). Only cells whose every
+    shortest route crossed a blocked edge are recomputed. Returns dist_map
+    itself if nothing changed, or None if more than MAX_REPAIR_CELLS cells
+    are affected.
+    """
+    # The far end of each blocked edge that lay on a shortest route
+    heap = []
+    for mask, step in ((new_h_edges, BOARD_SIZE), (new_v_edges, 1)):
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            a = low.bit_length() - 1
+            b = a + step
+            if dist_map[a] is None:
+                continue
+            if dist_map[a] == dist_map[b] + 1:
+                heap.append((dist_map[a], a))
+            elif dist_map[b] == dist_map[a] + 1:
+                heap.append((dist_map[b], b))
+    if not heap:
+        return dist_map
+
+    # Cells left without a neighbour one step closer, level by level, so
+    # each cell is judged after every cell it could lean on
+    heapq.heapify(heap)
+    affected = set()
+    while heap:
+        dist, cell = heapq.heappop(heap)
+        if cell in affected:
+            continue
+        neighbours = _open_neighbours(cell, h_edges, v_edges)
+        if any(dist_map[n] == dist - 1 and n not in affected for n in neighbours):
+            continue
+        affected.add(cell)
+        if len(affected) > MAX_REPAIR_CELLS:
+            return None
+        for n in neighbours:
+            if dist_map[n] == dist + 1:
+                heapq.heappush(heap, (dist + 1, n))
+
+    # Re-settle the affected cells from their unaffected border
+    new_map = list(dist_map)
+    for cell in affected:
+        new_map[cell] = None
+        border = [dist_map[n] + 1 for n in _open_neighbours(cell, h_edges, v_edges)
+                  if n not in affected and dist_map[n] is not None]
+        if border:
+            heap.append((min(border), cell))
+    heapq.heapify(heap)
+    while heap:
+        dist, cell = heapq.heappop(heap)
+        if new_map[cell] is not None:
+            continue
+        new_map[cell] = dist
+        for n in _open_neighbours(cell, h_edges, v_edges):
+            if n in affected and new_map[n] is None:
+                heapq.heappush(heap, (dist + 1, n))
+    return new_map
+
+def is_blocked(r1, c1, r2, c2, walls, edges=None):
+    h_edges, v_edges = edges if edges is not None else wall_edge_masks(walls)
+    return is_edge_blocked(r1, c1, r2, c2, h_edges, v_edges)
+
+def get_legal_moves(pawn_pos, opponent_pos, walls, edges=None):
+    h_edges, v_edges = edges if edges is not None else wall_edge_masks(walls)
+    moves = legal_move_cells(cell_of(pawn_pos), cell_of(opponent_pos), h_edges, v_edges)
+    return [list(CELL_COORDS[move]) for move in moves]
+
+def legal_move_cells(cell, opponent_cell, h_edges, v_edges):
+    """Legal pawn moves from cell as cell indexes, in get_legal_moves order"""
     moves = []
-    r, c = pawn_pos
-    r2, c2 = opponent_pos
-
-    directions = [(1,0), (-1,0), (0,1), (0,-1)]  # down, up, right, left
-    for dr, dc in directions:
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
-            if not is_blocked(r, c, nr, nc, walls):
-                if [nr, nc] == opponent_pos:
-                    # Adjacent to opponent - jump rules apply
-                    jr, jc = nr + dr, nc + dc
-                    # Check straight jump
-                    straight_jump_possible = (0 <= jr < BOARD_SIZE and 0 <= jc < BOARD_SIZE 
-                                             and not is_blocked(nr, nc, jr, jc, walls))
-                    
-                    if straight_jump_possible:
-                        moves.append([jr, jc])
-                    else:
-                        # L-shaped jump: perpendicular moves from opponent's position
-                        perp_dirs = [(0,1), (0,-1)] if dc == 0 else [(1,0), (-1,0)]
-                        for pdr, pdc in perp_dirs:
-                            side_r, side_c = nr + pdr, nc + pdc
-                            if 0 <= side_r < BOARD_SIZE and 0 <= side_c < BOARD_SIZE:
-                                if not is_blocked(nr, nc, side_r, side_c, walls):
-                                    moves.append([side_r, side_c])
-                else:
-                    moves.append([nr, nc])
+    for step, step_h, step_v, jump, jump_h, jump_v, sides in CELL_STEPS[cell]:
+        if step_h & h_edges or step_v & v_edges:
+            continue
+        if step != opponent_cell:
+            moves.append(step)
+        elif jump >= 0 and not (jump_h & h_edges or jump_v & v_edges):
+            moves.append(jump)
+        else:
+            # L-shaped jump: perpendicular moves from opponent's position
+            for side, side_h, side_v in sides:
+                if not (side_h & h_edges or side_v & v_edges):
+                    moves.append(side)
     return moves
 
 def is_valid_wall(row, col, orientation, walls):
@@ -145,6 +527,50 @@ def is_valid_wall(row, col, orientation, walls):
     
     return True
 
+# Wall slots: bit (row * (BOARD_SIZE - 1) + col) * 2 (+1 for 'V')
+def wall_slot(row, col, orientation):
+    return (row * (BOARD_SIZE - 1) + col) * 2 + (orientation == 'V')
+
+WALL_SLOT_NAMES = [(r, c, o) for r in range(BOARD_SIZE - 1) for c in range(BOARD_SIZE - 1) for o in 'HV']
+ALL_WALL_SLOTS = (1 << len(WALL_SLOT_NAMES)) - 1
+
+# Small-int action codes for fixed-width storage: 0 for none, 1 + cell for a
+# pawn move (cell index), 1 + cells + wall_slot for a wall (row, col, orientation)
+def action_code(action):
+    if action is None:
+        return 0
+    if type(action) is int:
+        return 1 + action
+    return 1 + BOARD_SIZE * BOARD_SIZE + wall_slot(*action)
+
+def code_action(code):
+    if code == 0:
+        return None
+    if code <= BOARD_SIZE * BOARD_SIZE:
+        return code - 1
+    return WALL_SLOT_NAMES[code - 1 - BOARD_SIZE * BOARD_SIZE]
+
+# WALL_CONFLICTS[slot] has a bit for every slot (itself included) that a wall
+# in slot makes illegal; built from is_valid_wall so the rules stay in one place
+WALL_CONFLICTS = []
+for _r, _c, _o in WALL_SLOT_NAMES:
+    _conflicts = 0
+    for _slot, (_r2, _c2, _o2) in enumerate(WALL_SLOT_NAMES):
+        if not is_valid_wall(_r2, _c2, _o2, [(_r, _c, _o, 0)]):
+            _conflicts |= 1 << _slot
+    WALL_CONFLICTS.append(_conflicts)
+
+# H_EDGE_SLOTS[bit] / V_EDGE_SLOTS[bit]: slots whose wall blocks that edge bit
+H_EDGE_SLOTS = [[] for _ in range(BOARD_SIZE * BOARD_SIZE)]
+V_EDGE_SLOTS = [[] for _ in range(BOARD_SIZE * BOARD_SIZE)]
+for _slot, (_r, _c, _o) in enumerate(WALL_SLOT_NAMES):
+    _h, _v = add_wall_edges(0, 0, _r, _c, _o)
+    for _bit in range(BOARD_SIZE * BOARD_SIZE):
+        if (_h >> _bit) & 1:
+            H_EDGE_SLOTS[_bit].append(_slot)
+        if (_v >> _bit) & 1:
+            V_EDGE_SLOTS[_bit].append(_slot)
+
 def apply_move(pawn_pos, move):
     return [move[0], move[1]]
 
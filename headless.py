@@ -0,0 +1,145 @@
+"""
+Headless Quoridor: the game loop from quoridor.py without pygame, for fast
+AI-vs-AI self-play.
+
+    python headless.py --games 20 --seed 0
+"""
+import argparse
+import json
+import random
+import time
+
+from game_rules import Board
+from ai.ai_player1 import AIPlayer1
+from ai.ai_player2 import AIPlayer2
+from ai.pathfinding import find_path_length
+
+MAX_MOVES = 500
+
+
+def play_turn(board, turn, ai):
+    """
+    Ask ai for its action and apply it to board.
+    Returns (action_type, action, applied), or None if ai has no action.
+    """
+    move = ai.choose_move(board, return_fuzzy=False)
+    if move is None:
+        return None
+
+    action_type, action = move
+    if action_type == "move":
+        board.apply_move(turn, action)
+        applied = True
+    else:
+        row, col, orient = action
+        applied = board.place_wall(turn, row, col, orient)
+    return action_type, action, applied
+
+
+def goal_reached(board, player):
+    goal_row = 0 if player == 1 else board.size - 1
+    return board.get_pawn_position(player)[0] == goal_row
+
+
+def distance_winner(board):
+    """Winner when the move limit is hit: the player closer to goal (player 2 on ties)"""
+    p1_dist = find_path_length(board, 1)
+    p2_dist = find_path_length(board, 2)
+    if p1_dist is not None and p2_dist is not None:
+        return 1 if p1_dist < p2_dist else 2
+    elif p1_dist is not None:
+        return 1
+    elif p2_dist is not None:
+        return 2
+    return 1
+
+
+def run_match(ai1, ai2, seed=None, max_moves=MAX_MOVES):
+    """
+    Play one game with ai1 as player 1 and ai2 as player 2.
+    Returns a dict with winner, reason ("goal", "no_action" or "move_limit"),
+    move count, walls left, duration and the action history.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    board = Board()
+    ais = {1: ai1, 2: ai2}
+    turn = 1
+    move_count = 0
+    history = []
+    start = time.perf_counter()
+
+    while True:
+        if move_count >= max_moves:
+            winner, reason = distance_winner(board), "move_limit"
+            break
+
+        result = play_turn(board, turn, ais[turn])
+        if result is None:
+            winner, reason = 3 - turn, "no_action"
+            break
+
+        action_type, action, applied = result
+        move_count += 1
+        history.append([turn, action_type, list(action), applied])
+
+        if action_type == "move" and goal_reached(board, turn):
+            winner, reason = turn, "goal"
+            break
+
+        turn = 3 - turn
+
+    return {
+        "winner": winner,
+        "reason": reason,
+        "moves": move_count,
+        "seed": seed,
+        "p1_walls_remaining": board.p1_walls_remaining,
+        "p2_walls_remaining": board.p2_walls_remaining,
+        "duration": time.perf_counter() - start,
+        "history": history,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AIPlayer1 vs AIPlayer2 without a display")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES)
+    parser.add_argument("--depth1", type=int, default=3, help="AIPlayer1 search depth")
+    parser.add_argument("--depth2", type=int, default=3, help="AIPlayer2 search depth")
+    parser.add_argument("--time-limit-ms", type=float, default=None,
+                        help="per-move time budget; searches deepen iteratively within it")
+    parser.add_argument("--wall-search", action="store_true",
+                        help="let both searches try candidate walls as well as pawn moves")
+    parser.add_argument("--node-budget", type=int, default=None, help="per-move cap on searched nodes")
+    parser.add_argument("--root-workers", type=int, default=None,
+                        help="score root moves of fixed-depth searches on this many processes")
+    parser.add_argument("--smp-workers", type=int, default=None,
+                        help="AIPlayer1 helper processes sharing its transposition table in budgeted searches")
+    parser.add_argument("--json", action="store_true", help="print one JSON result per line")
+    args = parser.parse_args()
+
+    wins = {1: 0, 2: 0}
+    for i in range(args.games):
+        ai1 = AIPlayer1(1, max_depth=args.depth1, time_limit_ms=args.time_limit_ms,
+                        wall_search=args.wall_search, node_budget=args.node_budget,
+                        root_workers=args.root_workers, smp_workers=args.smp_workers)
+        ai2 = AIPlayer2(2, max_depth=args.depth2, time_limit_ms=args.time_limit_ms,
+                        wall_search=args.wall_search, node_budget=args.node_budget,
+                        root_workers=args.root_workers)
+        result = run_match(ai1, ai2, seed=args.seed + i, max_moves=args.max_moves)
+        wins[result["winner"]] += 1
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"Game {i + 1} (seed {result['seed']}): Player {result['winner']} wins by "
+                  f"{result['reason']} in {result['moves']} moves ({result['duration']:.2f}s)")
+
+    if not args.json:
+        print(f"\nAI Player 1: {wins[1]}  AI Player 2: {wins[2]}")
+
+
+if __name__ == "__main__":
+    main()
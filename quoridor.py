@@ -3,6 +3,7 @@ from game_rules import get_legal_moves, is_valid_wall, Board
 
 from ai.ai_player1 import AIPlayer1
 from ai.ai_player2 import AIPlayer2
+from headless import play_turn, goal_reached, distance_winner
 
 pygame.init()
 
@@ -266,18 +267,7 @@ def main():
         # Safety check
         if move_count >= max_moves:
             print(f"\n⚠️ Safety limit reached ({max_moves} moves)")
-            from ai.pathfinding import AStarPathfinder
-            pathfinder = AStarPathfinder(board.get_legal_moves)
-            p1_dist = pathfinder.find_path_length(board, 1)
-            p2_dist = pathfinder.find_path_length(board, 2)
-            if p1_dist is not None and p2_dist is not None:
-                winner = 1 if p1_dist < p2_dist else 2
-            elif p1_dist is not None:
-                winner = 1
-            elif p2_dist is not None:
-                winner = 2
-            else:
-                winner = 1
+            winner = distance_winner(board)
             print(f"Winner by distance: Player {winner}")
             game_over = True
             continue
@@ -285,39 +275,30 @@ def main():
         # Get current AI
         ai = ai1 if turn == 1 else ai2
 
-        move = ai.choose_move(board, return_fuzzy=False)
+        result = play_turn(board, turn, ai)
 
-        if move is None:
+        if result is None:
             winner = 3 - turn
             print(f"Player {turn} has no valid actions! Player {winner} wins!")
             game_over = True
             continue
 
-        action_type, action = move
+        action_type, action, success = result
         move_count += 1
         
         if action_type == "move":
-            board.apply_move(turn, action)
             print(f"Move {move_count}: Player {turn} moved to {action}")
             
         elif action_type == "wall":
             row, col, orient = action
-            success = board.place_wall(turn, row, col, orient)
             if success:
                 print(f"Move {move_count}: Player {turn} placed {orient} wall at ({row},{col})")
 
         # Check for win
-        if action_type == "move":
-            current_pos = board.p1_pos if turn == 1 else board.p2_pos
-            
-            if turn == 1 and current_pos[0] == 0:
-                print(f"\n🎉 AI Player 1 WINS in {move_count} moves!")
-                game_over = True
-                winner = 1
-            elif turn == 2 and current_pos[0] == board.size - 1:
-                print(f"\n🎉 AI Player 2 WINS in {move_count} moves!")
-                game_over = True
-                winner = 2
+        if action_type == "move" and goal_reached(board, turn):
+            print(f"\n🎉 AI Player {turn} WINS in {move_count} moves!")
+            game_over = True
+            winner = turn
 
         turn = 3 - turn
         clock.tick(1)
@@ -0,0 +1,154 @@
+"""
+AIPlayer1 vs AIPlayer2 tournament over a process pool.
+
+Each worker process keeps its AI instances alive between games so their
+search and pathfinding caches stay warm. Results are appended to a JSON
+Lines file as games finish, each with the run's settings; rerunning with
+the same file and settings skips games that are already recorded.
+
+    python tournament.py --games 200 --workers 8 --results results.jsonl
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai.ai_player1 import AIPlayer1
+from ai.ai_player2 import AIPlayer2
+from headless import run_match, MAX_MOVES
+
+AI_CLASSES = {"AIPlayer1": AIPlayer1, "AIPlayer2": AIPlayer2}
+
+# Per-process AI instances, keyed by (class name, player id)
+_worker_ais = {}
+_worker_config = {}
+
+
+def _init_worker(depths, time_limit_ms):
+    _worker_config["depths"] = depths
+    _worker_config["time_limit_ms"] = time_limit_ms
+
+
+def _get_ai(name, player_id):
+    key = (name, player_id)
+    if key not in _worker_ais:
+        _worker_ais[key] = AI_CLASSES[name](player_id, max_depth=_worker_config["depths"][name],
+                                            time_limit_ms=_worker_config["time_limit_ms"])
+    ai = _worker_ais[key]
+    ai.new_game()
+    return ai
+
+
+def play_game(game):
+    """Worker entry point: play one scheduled game and return its result record"""
+    p1_name, p2_name = game["p1"], game["p2"]
+    result = run_match(_get_ai(p1_name, 1), _get_ai(p2_name, 2),
+                       seed=game["seed"], max_moves=game["max_moves"])
+    del result["history"]
+    result.update(game)
+    result["winner_ai"] = p1_name if result["winner"] == 1 else p2_name
+    result["worker"] = os.getpid()
+    return result
+
+
+def schedule(games, seed, max_moves):
+    """Game i uses seed + i; sides alternate so each AI plays both colours"""
+    schedule = []
+    for i in range(games):
+        p1, p2 = ("AIPlayer1", "AIPlayer2") if i % 2 == 0 else ("AIPlayer2", "AIPlayer1")
+        schedule.append({"game": i, "seed": seed + i, "p1": p1, "p2": p2, "max_moves": max_moves})
+    return schedule
+
+
+def load_results(path):
+    results = []
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        results.append(json.loads(line))
+                    except ValueError:
+                        # A run killed mid-write can leave a partial last line
+                        pass
+    return results
+
+
+def drop_partial_line(path):
+    """Cut an unterminated last line off path, so appended records start on a line of their own"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def summarize(results):
+    wins = {name: 0 for name in AI_CLASSES}
+    side_wins = {name: {1: 0, 2: 0} for name in AI_CLASSES}
+    for result in results:
+        wins[result["winner_ai"]] += 1
+        side_wins[result["winner_ai"]][result["winner"]] += 1
+    print(f"\n{len(results)} games")
+    for name in AI_CLASSES:
+        print(f"{name}: {wins[name]} wins "
+              f"({side_wins[name][1]} as player 1, {side_wins[name][2]} as player 2)")
+
+
+def run_tournament(games, workers, results_path, seed=0, depth1=3, depth2=3, max_moves=MAX_MOVES,
+                   time_limit_ms=None):
+    config = {"seed": seed, "depth1": depth1, "depth2": depth2, "max_moves": max_moves,
+              "time_limit_ms": time_limit_ms}
+    done = load_results(results_path)
+    for result in done:
+        if result.get("config") != config:
+            raise ValueError(f"{results_path} holds game {result['game']} played with settings "
+                             f"{result.get('config')}, not {config}; use a new results file")
+    finished = {result["game"] for result in done}
+    pending = [game for game in schedule(games, seed, max_moves) if game["game"] not in finished]
+    if finished:
+        print(f"Resuming: {len(finished)} games already in {results_path}, {len(pending)} to play")
+
+    # The workers get the AI settings once, from _init_worker
+    depths = {"AIPlayer1": depth1, "AIPlayer2": depth2}
+    drop_partial_line(results_path)
+    with open(results_path, "a") as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(depths, time_limit_ms)) as pool:
+        futures = [pool.submit(play_game, game) for game in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            result["config"] = config
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            done.append(result)
+            print(f"Game {result['game']} (seed {result['seed']}): {result['winner_ai']} wins as "
+                  f"player {result['winner']} by {result['reason']} in {result['moves']} moves")
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an AIPlayer1 vs AIPlayer2 tournament")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--results", default="tournament_results.jsonl", help="JSON Lines checkpoint file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth1", type=int, default=3, help="AIPlayer1 search depth")
+    parser.add_argument("--depth2", type=int, default=3, help="AIPlayer2 search depth")
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES)
+    parser.add_argument("--time-limit-ms", type=float, default=None, help="per-move time budget for both AIs")
+    args = parser.parse_args()
+
+    try:
+        results = run_tournament(args.games, args.workers, args.results, seed=args.seed,
+                                 depth1=args.depth1, depth2=args.depth2, max_moves=args.max_moves,
+                                 time_limit_ms=args.time_limit_ms)
+    except ValueError as e:
+        parser.error(str(e))
+    summarize(results)
+
+
+if __name__ == "__main__":
+    main()